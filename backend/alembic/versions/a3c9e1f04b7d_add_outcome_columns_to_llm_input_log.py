@@ -0,0 +1,36 @@
+"""add_outcome_columns_to_llm_input_log
+
+Revision ID: a3c9e1f04b7d
+Revises: 5deb3aa14285
+Create Date: 2026-10-16 10:12:41.508316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c9e1f04b7d'
+down_revision: Union[str, Sequence[str], None] = '5deb3aa14285'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('llm_input_log', sa.Column('output_text', sa.Text(), nullable=True))
+    op.add_column('llm_input_log', sa.Column('status', sa.String(), nullable=True))
+    op.add_column('llm_input_log', sa.Column('processing_time_ms', sa.Integer(), nullable=True))
+    op.add_column('llm_input_log', sa.Column('tokens_used', sa.Integer(), nullable=True))
+    op.add_column('llm_input_log', sa.Column('cost', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('llm_input_log', 'cost')
+    op.drop_column('llm_input_log', 'tokens_used')
+    op.drop_column('llm_input_log', 'processing_time_ms')
+    op.drop_column('llm_input_log', 'status')
+    op.drop_column('llm_input_log', 'output_text')
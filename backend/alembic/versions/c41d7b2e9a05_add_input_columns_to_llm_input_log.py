@@ -0,0 +1,38 @@
+"""add_input_columns_to_llm_input_log
+
+Revision ID: c41d7b2e9a05
+Revises: a3c9e1f04b7d
+Create Date: 2026-10-16 18:04:12.730914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d7b2e9a05'
+down_revision: Union[str, Sequence[str], None] = 'a3c9e1f04b7d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('llm_input_log', sa.Column('session_id', sa.String(), nullable=True))
+    op.add_column('llm_input_log', sa.Column('input_text', sa.Text(), nullable=True))
+    op.add_column('llm_input_log', sa.Column('input_type', sa.String(), nullable=True))
+    op.add_column('llm_input_log', sa.Column('model_name', sa.String(), nullable=True))
+    op.add_column('llm_input_log', sa.Column('parameters', sa.Text(), nullable=True))
+    op.create_index(op.f('ix_llm_input_log_session_id'), 'llm_input_log', ['session_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_llm_input_log_session_id'), table_name='llm_input_log')
+    op.drop_column('llm_input_log', 'parameters')
+    op.drop_column('llm_input_log', 'model_name')
+    op.drop_column('llm_input_log', 'input_type')
+    op.drop_column('llm_input_log', 'input_text')
+    op.drop_column('llm_input_log', 'session_id')
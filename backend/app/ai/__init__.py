@@ -1,8 +1,28 @@
 """AI Configuration and utilities"""
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+import functools
+import importlib.util
+import logging
 import os
-from typing import Optional
+import time
 import dspy
-from app.core.config import settings
+import httpx
+import litellm
+
+logger = logging.getLogger(__name__)
+
+# Connection pool shared by every async LiteLLM call made through DSPy
+LLM_HTTP_LIMITS = httpx.Limits(
+    max_keepalive_connections=int(os.getenv("AI_HTTP_MAX_KEEPALIVE", "64")),
+    max_connections=int(os.getenv("AI_HTTP_MAX_CONNECTIONS", "256"))
+)
+LLM_HTTP_TIMEOUT = float(os.getenv("AI_HTTP_TIMEOUT", "60"))
+# HTTP/2 multiplexes concurrent calls over one connection; httpx needs the h2 package for it
+LLM_HTTP2 = os.getenv("AI_HTTP2", "1") == "1" and importlib.util.find_spec("h2") is not None
+
+# Most recent DummyLM requests as (timestamp, messages or prompt), newest last
+_DUMMY_RING: Deque[Tuple[float, Any]] = deque(maxlen=1024)
 
 # Configure DSPy LM
 def get_dspy_lm() -> dspy.LM:
@@ -24,11 +44,10 @@ class DummyLM(dspy.LM):
         super().__init__(model="dummy", api_key="dummy")
     
     def __call__(self, prompt=None, messages=None, **kwargs):
-        # Log the prompt and return a dummy response
-        if messages:
-            print(f"[DUMMY LM] Messages: {messages}")
-        elif prompt:
-            print(f"[DUMMY LM] Prompt: {prompt}")
+        # Record the prompt and return a dummy response
+        _DUMMY_RING.append((time.time(), messages or prompt))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[DUMMY LM] %s", messages or prompt)
         
         return "This is a dummy AI response for development purposes. The analysis has been completed successfully."
     
@@ -42,6 +61,58 @@ class DummyLM(dspy.LM):
         response = self(prompt=prompt, messages=messages, **kwargs)
         return [{"text": response}]
 
-# Global LM instance
-lm = get_dspy_lm()
-dspy.configure(lm=lm)
\ No newline at end of file
+def get_dummy_lm_log(limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Return the recorded DummyLM requests, oldest first"""
+    entries = list(_DUMMY_RING)
+    if limit is not None:
+        entries = entries[-limit:] if limit > 0 else []
+    return [{"timestamp": timestamp, "request": request} for timestamp, request in entries]
+
+# Global LM instance, built on first use rather than at import time
+@functools.lru_cache(maxsize=1)
+def get_lm() -> dspy.LM:
+    """Return the shared DSPy Language Model"""
+    return get_dspy_lm()
+
+
+_configured = False
+
+
+def configure_dspy() -> None:
+    """Install the shared LM as DSPy's default, once per process"""
+    global _configured
+    if not _configured:
+        dspy.configure(lm=get_lm())
+        _configured = True
+
+
+async def start_llm_http_client() -> None:
+    """Give LiteLLM pooled HTTP clients, the async one bound to the running event loop
+    
+    The clients live until :func:`close_llm_http_client`, so every LLM call,
+    sync or async, reuses warm connections instead of a fresh TLS handshake.
+    """
+    if litellm.aclient_session is None:
+        litellm.aclient_session = httpx.AsyncClient(
+            limits=LLM_HTTP_LIMITS,
+            timeout=LLM_HTTP_TIMEOUT,
+            http2=LLM_HTTP2
+        )
+    if litellm.client_session is None:
+        litellm.client_session = httpx.Client(
+            limits=LLM_HTTP_LIMITS,
+            timeout=LLM_HTTP_TIMEOUT,
+            http2=LLM_HTTP2
+        )
+
+
+async def close_llm_http_client() -> None:
+    """Close the clients installed by :func:`start_llm_http_client`"""
+    client = litellm.aclient_session
+    if client is not None:
+        litellm.aclient_session = None
+        await client.aclose()
+    sync_client = litellm.client_session
+    if sync_client is not None:
+        litellm.client_session = None
+        sync_client.close()
\ No newline at end of file
@@ -0,0 +1,156 @@
+"""Background writer that coalesces stage artifact inserts across requests"""
+from typing import Any, Callable, List, Optional, Tuple
+import asyncio
+import logging
+import os
+from sqlalchemy.orm import Session
+
+from app.db import AsyncSessionLocal, SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# A batch is committed once it holds this many artifacts or its flush interval elapses
+ARTIFACT_BATCH_SIZE = int(os.getenv("AI_ARTIFACT_BATCH_SIZE", "64"))
+ARTIFACT_FLUSH_INTERVAL = float(os.getenv("AI_ARTIFACT_FLUSH_INTERVAL", "0.01"))
+
+
+class ArtifactBatchWriter:
+    """Commits artifacts from concurrent requests together, resolving each to its id"""
+    
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        batch_size: int = ARTIFACT_BATCH_SIZE,
+        flush_interval: float = ARTIFACT_FLUSH_INTERVAL,
+        async_session_factory: Optional[Callable[[], Any]] = AsyncSessionLocal
+    ):
+        self.session_factory = session_factory
+        # None for SQLite, which has no async driver; writes then go through a thread
+        self.async_session_factory = async_session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def start(self) -> None:
+        """Start the writer task on the running event loop"""
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._task = self._loop.create_task(self._run())
+    
+    async def stop(self) -> None:
+        """Commit every queued artifact, then stop the writer task"""
+        if self._task is None:
+            return
+        # The sentinel sits behind every queued artifact, so the queue drains first
+        self._queue.put_nowait(None)
+        await self._task
+        self._task = None
+        self._queue = None
+        self._loop = None
+    
+    def is_running(self) -> bool:
+        """Return True when called from the loop the writer task runs on"""
+        try:
+            return self._queue is not None and asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+    
+    async def save(self, *artifacts: Any) -> List[Any]:
+        """Queue ``artifacts`` for the next batch and return their ids once committed"""
+        futures = []
+        for artifact in artifacts:
+            future = self._loop.create_future()
+            self._queue.put_nowait((artifact, future))
+            futures.append(future)
+        return list(await asyncio.gather(*futures))
+    
+    async def write(self, artifacts: List[Any]) -> List[Any]:
+        """Commit ``artifacts`` right away, without batching, and return their ids"""
+        if self.async_session_factory is None:
+            return await asyncio.to_thread(self._write, artifacts)
+        
+        async with self.async_session_factory() as session:
+            try:
+                session.add_all(artifacts)
+                await session.flush()
+                ids = [artifact.id for artifact in artifacts]
+                await session.commit()
+                return ids
+            except Exception:
+                await session.rollback()
+                raise
+    
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+            
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            
+            try:
+                await self._flush(batch)
+            except Exception as e:
+                # Keep the writer alive for later batches; fail whoever is still waiting on this one
+                logger.exception("Artifact batch flush failed")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+    
+    async def _flush(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        try:
+            ids = await self.write([artifact for artifact, _ in batch])
+        except Exception as e:
+            logger.error("Batched artifact insert failed, retrying %d rows one by one: %s", len(batch), e)
+            # One bad row should only fail its own request
+            for artifact, future in batch:
+                # Its request was cancelled (e.g. the client disconnected)
+                if future.done():
+                    continue
+                try:
+                    future.set_result((await self.write([artifact]))[0])
+                except Exception as row_error:
+                    future.set_exception(row_error)
+            return
+        
+        for (_, future), artifact_id in zip(batch, ids):
+            if not future.done():
+                future.set_result(artifact_id)
+    
+    def _write(self, artifacts: List[Any]) -> List[Any]:
+        session = self.session_factory()
+        try:
+            session.add_all(artifacts)
+            # Flushing assigns the primary keys; same-table rows go out as one multi-row INSERT
+            session.flush()
+            ids = [artifact.id for artifact in artifacts]
+            session.commit()
+            return ids
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+
+artifact_writer = ArtifactBatchWriter()
\ No newline at end of file
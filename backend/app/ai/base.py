@@ -1,27 +1,63 @@
 """Base AI service for idea stage processing"""
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+import asyncio
+import os
+import re
+import time
 import uuid
 from datetime import datetime
 from sqlmodel import Session
 
-from app.models import (
-    Idea, LLMInputLog, LLMProcessingLog, LLMInputLogCreate, 
-    LLMProcessingLogCreate, User
-)
+from app.models import Idea, User
 from app.llm_center import LLMCenter, PromptType, ProcessingContext
+from app.ai import configure_dspy
+from app.ai.artifact_writer import artifact_writer
+from app.ai.cache import response_cache
+from app.ai.log_writer import build_log_record, log_writer
 import dspy
 
+# Ideas packed into a single prompt by the row-marshaled batch path
+STAGE_BATCH_SIZE = int(os.getenv("AI_STAGE_BATCH_SIZE", "5"))
+# Max in-flight LLM calls per batch; tune to the provider's rate limit
+STAGE_BATCH_CONCURRENCY = int(os.getenv("AI_STAGE_CONCURRENCY", "8"))
+
+# Error reported when a stage is invoked without any stage-specific input
+INSUFFICIENT_INPUT_ERROR = "insufficient_input"
+
+BATCH_OUTPUT_DELIMITER = re.compile(r"^=== OUTPUT (\d+) ===[ \t]*$", re.MULTILINE)
+
+# Anthropic only caches prompt prefixes that are explicitly marked; OpenAI caches
+# shared prefixes automatically, so the extra LM config is only sent for Claude
+PROMPT_CACHE_CONFIG: Dict[str, Any] = (
+    {"cache_control_injection_points": [{"location": "message", "role": "system"}]}
+    if os.getenv("AI_MODEL", "").startswith(("anthropic/", "claude"))
+    else {}
+)
+
 
 class AIService(ABC):
     """Base class for AI services that handle different idea stages"""
     
-    def __init__(self, session: Session):
+    # Services are built for every request, so instances skip the per-instance __dict__
+    __slots__ = ("session", "_request_session_id", "llm_center", "_processor")
+    
+    # Services that implement the batch hooks below set this to their log input type
+    input_type: Optional[str] = None
+    # Result key under which the stored artifact's id is returned
+    result_id_key: str = "artifact_id"
+    
+    def __init__(self, session: Session, session_id: Optional[str] = None):
         self.session = session
+        # Groups every LLM log written while serving one request
+        self._request_session_id = session_id or uuid.uuid4().hex
         self.llm_center = LLMCenter(db_session=session)
+        # Shared per stage across the process, see get_stage_processor
+        self._processor = self.create_processor()
     
     @abstractmethod
-    def process_stage(self, idea: Idea, user: User, **kwargs) -> Dict[str, Any]:
+    async def process_stage(self, idea: Idea, user: User, **kwargs) -> Dict[str, Any]:
         """Process an idea for this specific stage
         
         Args:
@@ -39,6 +75,236 @@ class AIService(ABC):
         """Return the name of this stage"""
         pass
     
+    @abstractmethod
+    def create_processor(self) -> "StageProcessor":
+        """Return the DSPy processor for this stage, usually via :func:`get_stage_processor`"""
+        pass
+    
+    def build_stage_context(self, **kwargs) -> str:
+        """Return the stage context shared by every idea in a batch"""
+        raise NotImplementedError
+    
+    def build_input_text(self, idea: Idea, **kwargs) -> str:
+        """Return the text logged as the LLM input for ``idea``"""
+        raise NotImplementedError
+    
+    def build_artifact(self, idea: Idea, user: User, ai_output: str) -> Any:
+        """Return the (unsaved) stage artifact recording ``ai_output`` for ``idea``"""
+        raise NotImplementedError
+    
+    async def generate_output(self, idea: Idea, stage_context: str) -> str:
+        """Return the stage output for ``idea``, reusing a cached response when possible"""
+        stage = self.get_stage_name()
+        processor = self._processor
+        # The instructions are part of the key so prompt edits invalidate old entries
+        key = response_cache.make_key(
+            stage,
+            processor.system_prefix,
+            processor.custom_instructions,
+            idea.title or "",
+            idea.description or "",
+            stage_context
+        )
+        text = f"{idea.title}\n{idea.description}\n{stage_context}"
+        
+        cached, embedding = await response_cache.lookup(stage, key, text)
+        if cached is not None:
+            return cached
+        
+        result = await processor.aforward(
+            idea_title=idea.title,
+            idea_description=idea.description,
+            stage_context=stage_context
+        )
+        ai_output = result.output if hasattr(result, 'output') else str(result)
+        
+        await response_cache.store(stage, key, text, ai_output, embedding)
+        return ai_output
+    
+    def has_stage_input(self, **kwargs) -> bool:
+        """Return False when the stage fields carry nothing worth an LLM call"""
+        return True
+    
+    def insufficient_input_result(self) -> Dict[str, Any]:
+        """Result returned instead of calling the LLM when :meth:`has_stage_input` is False"""
+        return {
+            "success": False,
+            "stage": self.get_stage_name(),
+            "error": INSUFFICIENT_INPUT_ERROR,
+            "processing_time_ms": 0
+        }
+    
+    async def stream_stage(self, idea: Idea, user: User, **kwargs) -> AsyncIterator[Dict[str, Any]]:
+        """Process an idea, yielding output chunks as the model produces them
+        
+        Yields ``{"type": "chunk", "text": ...}`` frames while the output streams,
+        then a single ``{"type": "result", ...}`` frame carrying the same fields as
+        :meth:`process_stage` once the artifact is stored. Services without the
+        batch hooks yield only the final result frame.
+        """
+        if self.input_type is None:
+            yield {"type": "result", **await self.process_stage(idea, user, **kwargs)}
+            return
+        
+        if not self.has_stage_input(**kwargs):
+            yield {"type": "result", **self.insufficient_input_result()}
+            return
+        
+        start_ns = time.perf_counter_ns()
+        input_text = ""
+        
+        try:
+            stage_context = self.build_stage_context(**kwargs)
+            input_text = self.build_input_text(idea, **kwargs)
+            
+            chunks: List[str] = []
+            async for chunk in self._processor.stream(
+                idea_title=idea.title,
+                idea_description=idea.description,
+                stage_context=stage_context
+            ):
+                if isinstance(chunk, str):
+                    chunks.append(chunk)
+                    yield {"type": "chunk", "text": chunk}
+                else:
+                    # The final prediction; prefer its parsed output over the raw chunks
+                    chunks = [chunk.output]
+            
+            ai_output = "".join(chunks)
+            processing_time = (time.perf_counter_ns() - start_ns) // 1_000_000
+            
+            self.log_llm_interaction(
+                user=user,
+                input_text=input_text,
+                input_type=self.input_type,
+                output_text=ai_output,
+                status="completed",
+                processing_time_ms=processing_time
+            )
+            artifact_ids = await self.save_artifacts(self.build_artifact(idea, user, ai_output))
+            
+            yield {
+                "type": "result",
+                "success": True,
+                "stage": self.get_stage_name(),
+                "ai_output": ai_output,
+                self.result_id_key: artifact_ids[0],
+                "processing_time_ms": processing_time
+            }
+        
+        except Exception as e:
+            processing_time = (time.perf_counter_ns() - start_ns) // 1_000_000
+            
+            self.log_llm_interaction(
+                user=user,
+                input_text=input_text,
+                input_type=self.input_type,
+                status="failed",
+                error_message=str(e),
+                processing_time_ms=processing_time
+            )
+            
+            yield {
+                "type": "result",
+                "success": False,
+                "stage": self.get_stage_name(),
+                "error": str(e),
+                "processing_time_ms": processing_time
+            }
+    
+    async def aprocess_stage_batch(
+        self,
+        ideas: List[Idea],
+        user: User,
+        batch_size: int = STAGE_BATCH_SIZE,
+        concurrency: int = STAGE_BATCH_CONCURRENCY,
+        **kwargs
+    ) -> List[Dict[str, Any]]:
+        """Process several ideas, packing up to ``batch_size`` of them into one prompt
+        
+        The stage context is sent once per group instead of once per idea, and
+        up to ``concurrency`` groups are in flight at once. Services without
+        batch hooks fall back to one call per idea.
+        
+        Args:
+            ideas: The ideas to process
+            user: The user requesting the processing
+            batch_size: Maximum number of ideas per LLM call
+            concurrency: Maximum number of LLM calls in flight
+            **kwargs: Stage-specific parameters applied to every idea
+            
+        Returns:
+            List of processing results, in the same order as ``ideas``
+        """
+        if self.input_type is None:
+            return [await self.process_stage(idea, user, **kwargs) for idea in ideas]
+        
+        if not self.has_stage_input(**kwargs):
+            return [self.insufficient_input_result() for _ in ideas]
+        
+        stage_context = self.build_stage_context(**kwargs)
+        semaphore = asyncio.Semaphore(concurrency)
+        groups = [ideas[start:start + batch_size] for start in range(0, len(ideas), batch_size)]
+        
+        async def generate(group: List[Idea]) -> Tuple[List[Optional[str]], Optional[str], int]:
+            async with semaphore:
+                start_ns = time.perf_counter_ns()
+                try:
+                    outputs = await self._processor.aforward_batch(
+                        [{"title": idea.title, "description": idea.description} for idea in group],
+                        stage_context=stage_context
+                    )
+                    error = None
+                except Exception as e:
+                    outputs = [None] * len(group)
+                    error = str(e)
+                return outputs, error, (time.perf_counter_ns() - start_ns) // 1_000_000
+        
+        generated = await asyncio.gather(*(generate(group) for group in groups))
+        
+        results: List[Dict[str, Any]] = []
+        log_entries: List[Dict[str, Any]] = []
+        artifacts: List[Any] = []
+        stored_results: List[Dict[str, Any]] = []
+        
+        for group, (outputs, error, processing_time) in zip(groups, generated):
+            for idea, ai_output in zip(group, outputs):
+                entry = {
+                    "user": user,
+                    "input_text": self.build_input_text(idea, **kwargs),
+                    "input_type": self.input_type,
+                    "processing_time_ms": processing_time
+                }
+                
+                if ai_output is None:
+                    message = error or "No output returned for this idea in the batch"
+                    log_entries.append({**entry, "status": "failed", "error_message": message})
+                    results.append({
+                        "success": False,
+                        "stage": self.get_stage_name(),
+                        "error": message,
+                        "processing_time_ms": processing_time
+                    })
+                    continue
+                
+                log_entries.append({**entry, "status": "completed", "output_text": ai_output})
+                artifact = self.build_artifact(idea, user, ai_output)
+                artifacts.append(artifact)
+                stored_results.append({
+                    "success": True,
+                    "stage": self.get_stage_name(),
+                    "ai_output": ai_output,
+                    "processing_time_ms": processing_time
+                })
+                results.append(stored_results[-1])
+        
+        self.log_llm_interaction_bulk(log_entries)
+        artifact_ids = await self.save_artifacts(*artifacts)
+        for result, artifact_id in zip(stored_results, artifact_ids):
+            result[self.result_id_key] = artifact_id
+        
+        return results
+    
     async def call_llm_for_stage(
         self,
         prompt_type: PromptType,
@@ -73,44 +339,48 @@ class AIService(ABC):
         error_message: Optional[str] = None,
         processing_time_ms: Optional[int] = None,
         tokens_used: Optional[int] = None,
-        cost: Optional[float] = None
-    ) -> LLMProcessingLog:
-        """Log LLM interaction to database"""
-        
-        # Create input log
-        input_log_data = LLMInputLogCreate(
-            input_text=input_text,
-            input_type=input_type,
-            model_name="gpt-4o-mini",  # Default model
-            parameters="{}",  # JSON string of parameters
-            context="{}"  # JSON string of context
-        )
-        
-        input_log = LLMInputLog.model_validate(
-            input_log_data, 
-            update={"user_id": user.id, "session_id": str(uuid.uuid4())}
-        )
-        self.session.add(input_log)
-        self.session.flush()  # Get the ID
-        
-        # Create processing log
-        processing_log_data = LLMProcessingLogCreate(
+        cost: Optional[float] = None,
+        parameters: Optional[Dict[str, Any]] = None,
+        context: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Queue an LLM interaction for the background log writer"""
+        log_writer.enqueue(build_log_record(
+            user.id,
+            self._request_session_id,
+            input_text,
+            input_type,
             output_text=output_text,
             status=status,
             error_message=error_message,
             processing_time_ms=processing_time_ms,
             tokens_used=tokens_used,
-            cost=cost
-        )
+            cost=cost,
+            parameters=parameters,
+            context=context,
+            stage=self.get_stage_name()
+        ))
+    
+    def log_llm_interaction_bulk(self, entries: List[Dict[str, Any]]) -> None:
+        """Queue several LLM interactions for the background log writer
         
-        processing_log = LLMProcessingLog.model_validate(
-            processing_log_data,
-            update={"input_log_id": input_log.id}
-        )
-        self.session.add(processing_log)
-        self.session.commit()
+        Args:
+            entries: Dicts holding the keyword arguments of :meth:`log_llm_interaction`
+        """
+        for entry in entries:
+            self.log_llm_interaction(**entry)
+    
+    async def save_artifacts(self, *artifacts: Any) -> List[Any]:
+        """Persist stage artifacts and return their ids
         
-        return processing_log
+        While the app is serving, inserts from concurrent requests are committed
+        together by the artifact writer; otherwise they are committed right away.
+        Either way the commit does not block the event loop.
+        """
+        if not artifacts:
+            return []
+        if artifact_writer.is_running():
+            return await artifact_writer.save(*artifacts)
+        return await artifact_writer.write(list(artifacts))
 
 
 class StagePrompt(dspy.Signature):
@@ -121,15 +391,44 @@ class StagePrompt(dspy.Signature):
     output: str = dspy.OutputField(desc="Stage-specific AI analysis and recommendations")
 
 
+class StageBatchPrompt(dspy.Signature):
+    """Signature for processing several ideas through a stage in one call"""
+    ideas: str = dspy.InputField(desc="Ideas to analyze, each introduced by '=== IDEA {n} ==='")
+    stage_context: str = dspy.InputField(desc="Context specific to this stage, shared by all ideas")
+    output: str = dspy.OutputField(
+        desc="One analysis per idea, each introduced by '=== OUTPUT {n} ===' using the idea's number"
+    )
+
+
 class StageProcessor(dspy.Module):
     """Base DSPy module for processing idea stages"""
     
-    def __init__(self, stage_name: str, custom_instructions: str = "", llm_center: Optional[LLMCenter] = None):
+    def __init__(
+        self,
+        stage_name: str,
+        custom_instructions: str = "",
+        llm_center: Optional[LLMCenter] = None,
+        system_prefix: str = ""
+    ):
         super().__init__()
+        configure_dspy()
         self.stage_name = stage_name
         self.custom_instructions = custom_instructions
         self.llm_center = llm_center or LLMCenter()
-        self.generate = dspy.ChainOfThought(StagePrompt)
+        self.system_prefix = system_prefix
+        # The static prefix rides in the signature instructions, which DSPy sends
+        # as the system message, so it stays byte-identical across calls
+        self.generate = dspy.ChainOfThought(self._with_system_prefix(StagePrompt))
+        self.generate_batch = dspy.ChainOfThought(self._with_system_prefix(StageBatchPrompt))
+        self.generate_stream = dspy.streamify(
+            self.generate,
+            stream_listeners=[dspy.streaming.StreamListener(signature_field_name="output")]
+        )
+    
+    def _with_system_prefix(self, signature: type[dspy.Signature]) -> type[dspy.Signature]:
+        if not self.system_prefix:
+            return signature
+        return signature.with_instructions(f"{signature.instructions}\n\n{self.system_prefix}")
     
     def forward(self, idea_title: str, idea_description: str, stage_context: str = ""):
         """Process the idea through this stage"""
@@ -138,7 +437,108 @@ class StageProcessor(dspy.Module):
         result = self.generate(
             idea_title=idea_title,
             idea_description=idea_description,
-            stage_context=enhanced_context
+            stage_context=enhanced_context,
+            config=PROMPT_CACHE_CONFIG
+        )
+        
+        return result
+    
+    async def aforward(self, idea_title: str, idea_description: str, stage_context: str = ""):
+        """Async variant of :meth:`forward` that awaits the LM call"""
+        enhanced_context = f"{self.custom_instructions}\n\nStage: {self.stage_name}\n{stage_context}"
+        
+        result = await self.generate.acall(
+            idea_title=idea_title,
+            idea_description=idea_description,
+            stage_context=enhanced_context,
+            config=PROMPT_CACHE_CONFIG
         )
         
-        return result
\ No newline at end of file
+        return result
+    
+    async def stream(
+        self,
+        idea_title: str,
+        idea_description: str,
+        stage_context: str = ""
+    ) -> AsyncIterator[Union[str, dspy.Prediction]]:
+        """Stream the ``output`` field as it is generated
+        
+        Yields text chunks of the output, followed by the final prediction.
+        """
+        enhanced_context = f"{self.custom_instructions}\n\nStage: {self.stage_name}\n{stage_context}"
+        
+        async for message in self.generate_stream(
+            idea_title=idea_title,
+            idea_description=idea_description,
+            stage_context=enhanced_context,
+            config=PROMPT_CACHE_CONFIG
+        ):
+            if isinstance(message, dspy.streaming.StreamResponse):
+                yield message.chunk
+            elif isinstance(message, dspy.Prediction):
+                yield message
+    
+    def forward_batch(self, items: List[Dict[str, str]], stage_context: str = "") -> List[Optional[str]]:
+        """Process several ideas in a single call
+        
+        Args:
+            items: Dicts with ``title`` and ``description`` keys
+            stage_context: Stage context shared by every item
+            
+        Returns:
+            One output per item, or None where the model omitted a section
+        """
+        result = self.generate_batch(
+            ideas=self._format_batch(items),
+            stage_context=self._enhance_batch_context(stage_context),
+            config=PROMPT_CACHE_CONFIG
+        )
+        return self._split_batch_output(result.output, len(items))
+    
+    async def aforward_batch(self, items: List[Dict[str, str]], stage_context: str = "") -> List[Optional[str]]:
+        """Async variant of :meth:`forward_batch`"""
+        result = await self.generate_batch.acall(
+            ideas=self._format_batch(items),
+            stage_context=self._enhance_batch_context(stage_context),
+            config=PROMPT_CACHE_CONFIG
+        )
+        return self._split_batch_output(result.output, len(items))
+    
+    def _enhance_batch_context(self, stage_context: str) -> str:
+        return (
+            f"{self.custom_instructions}\n\nStage: {self.stage_name}\n{stage_context}\n\n"
+            "Analyze each idea independently. Start the analysis of idea N with a line "
+            "'=== OUTPUT N ===' and do not write anything before the first marker."
+        )
+    
+    @staticmethod
+    def _format_batch(items: List[Dict[str, str]]) -> str:
+        return "\n\n".join(
+            f"=== IDEA {i} ===\nTitle: {item['title']}\nDescription: {item['description']}"
+            for i, item in enumerate(items, 1)
+        )
+    
+    @staticmethod
+    def _split_batch_output(text: str, count: int) -> List[Optional[str]]:
+        parts = BATCH_OUTPUT_DELIMITER.split(text or "")
+        outputs: Dict[int, str] = {}
+        # parts = [preamble, n1, body1, n2, body2, ...]
+        for number, body in zip(parts[1::2], parts[2::2]):
+            outputs.setdefault(int(number), body.strip())
+        return [outputs.get(i) or None for i in range(1, count + 1)]
+
+
+@lru_cache(maxsize=None)
+def get_stage_processor(stage_name: str, custom_instructions: str = "", system_prefix: str = "") -> StageProcessor:
+    """Return the process-wide processor for a stage, built on first use
+    
+    Constructing the DSPy predictors is not free, and they keep no per-call
+    state (everything stage-specific is passed to ``forward``), so a single
+    instance serves every request and service.
+    """
+    return StageProcessor(
+        stage_name=stage_name,
+        custom_instructions=custom_instructions,
+        system_prefix=system_prefix
+    )
\ No newline at end of file
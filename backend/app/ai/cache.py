@@ -0,0 +1,341 @@
+"""Redis caches for AI stage results and LLM responses"""
+from collections import OrderedDict
+from functools import lru_cache, wraps
+from hashlib import blake2b, sha256
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import os
+import time
+import orjson
+
+try:
+    import redis.asyncio as redis
+except ImportError:
+    redis = None
+
+try:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    np = None
+    SentenceTransformer = None
+
+from app.models import Idea, User
+
+logger = logging.getLogger(__name__)
+
+# Seconds a stage result stays cached
+STAGE_CACHE_TTL = int(os.getenv("AI_STAGE_CACHE_TTL", "86400"))
+
+# Seconds an LLM response stays cached, and the similarity needed for a semantic hit
+RESPONSE_CACHE_TTL = int(os.getenv("AI_RESPONSE_CACHE_TTL", "86400"))
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("AI_SEMANTIC_CACHE_THRESHOLD", "0.95"))
+SEMANTIC_CACHE_MODEL = os.getenv("AI_SEMANTIC_CACHE_MODEL", "all-MiniLM-L6-v2")
+
+# Embeddings kept per stage for semantic lookups (oldest evicted first), and how
+# many of the closest cached outputs a lookup tries before giving up
+SEMANTIC_INDEX_MAX_ENTRIES = int(os.getenv("AI_SEMANTIC_INDEX_MAX_ENTRIES", "1000"))
+SEMANTIC_CANDIDATES = 3
+
+# Prompts embedded in one encoder call, and how long a batch waits to fill
+EMBEDDING_BATCH_SIZE = int(os.getenv("AI_EMBEDDING_BATCH_SIZE", "64"))
+EMBEDDING_BATCH_WINDOW = float(os.getenv("AI_EMBEDDING_BATCH_WINDOW", "0.005"))
+
+redis_client = None
+if redis:
+    try:
+        redis_client = redis.Redis.from_url(os.environ.get('REDIS_URL', 'redis://localhost:6379/0'))
+    except Exception:
+        redis_client = None
+
+# Running process_stage calls by inflight_key, so identical concurrent calls share one
+_INFLIGHT: Dict[str, "asyncio.Task[Dict[str, Any]]"] = {}
+
+
+def stage_cache_key(stage: str, idea: Idea, user: User, kwargs: Dict[str, Any]) -> str:
+    """Return the cache key for running ``stage`` on the current content of ``idea``"""
+    updated_at = getattr(idea, "updated_at", None)
+    raw = "|".join((
+        stage,
+        str(user.id),
+        updated_at.isoformat() if updated_at else "",
+        idea.title or "",
+        idea.description or "",
+        orjson.dumps(kwargs, option=orjson.OPT_SORT_KEYS, default=str).decode()
+    ))
+    return "ai:stage:" + blake2b(raw.encode("utf-8"), digest_size=20).hexdigest()
+
+
+def inflight_key(stage: str, idea: Idea, kwargs: Dict[str, Any]) -> str:
+    """Return the key shared by concurrent runs of ``stage`` with the same input, whoever requests them"""
+    raw = "|".join((
+        stage,
+        str(idea.id),
+        idea.title or "",
+        idea.description or "",
+        orjson.dumps(kwargs, option=orjson.OPT_SORT_KEYS, default=str).decode()
+    ))
+    return blake2b(raw.encode("utf-8"), digest_size=20).hexdigest()
+
+
+def memoize_stage(ttl: int = STAGE_CACHE_TTL) -> Callable:
+    """Cache successful ``process_stage`` results in Redis
+    
+    A hit returns the stored result, including the id of the artifact persisted
+    on the original run, without calling the LLM or writing a new artifact.
+    The cache is best-effort: without Redis, or on a Redis error, the wrapped
+    method simply runs.
+    
+    Calls made while an identical call is still running (same stage, idea and
+    input) wait for it and share its result instead of running again.
+    """
+    def decorator(func: Callable[..., Awaitable[Dict[str, Any]]]) -> Callable[..., Awaitable[Dict[str, Any]]]:
+        async def run(self, idea: Idea, user: User, **kwargs) -> Dict[str, Any]:
+            if redis_client is None:
+                return await func(self, idea, user, **kwargs)
+            
+            key = stage_cache_key(self.get_stage_name(), idea, user, kwargs)
+            cached: Optional[bytes] = None
+            try:
+                cached = await redis_client.get(key)
+            except Exception as e:
+                logger.warning("Stage cache lookup failed: %s", e)
+            if cached is not None:
+                return {**orjson.loads(cached), "cached": True}
+            
+            result = await func(self, idea, user, **kwargs)
+            if result.get("success"):
+                try:
+                    await redis_client.setex(key, ttl, orjson.dumps(result, default=str))
+                except Exception as e:
+                    logger.warning("Stage cache store failed: %s", e)
+            return result
+        
+        @wraps(func)
+        async def wrapper(self, idea: Idea, user: User, **kwargs) -> Dict[str, Any]:
+            key = inflight_key(self.get_stage_name(), idea, kwargs)
+            task = _INFLIGHT.get(key)
+            if task is not None:
+                return {**await asyncio.shield(task), "coalesced": True}
+            
+            task = asyncio.ensure_future(run(self, idea, user, **kwargs))
+            _INFLIGHT[key] = task
+            task.add_done_callback(lambda _: _INFLIGHT.pop(key, None))
+            # Shielded so a caller that goes away does not cancel the run for the others
+            return await asyncio.shield(task)
+        return wrapper
+    return decorator
+
+
+@lru_cache(maxsize=1)
+def get_encoder() -> "SentenceTransformer":
+    """Return the sentence encoder used by the semantic cache, loaded on first use"""
+    return SentenceTransformer(SEMANTIC_CACHE_MODEL)
+
+
+class EmbeddingBatcher:
+    """Encodes the prompts of concurrent cache lookups together
+    
+    The encoder costs nearly the same for a batch as for a single text, so texts
+    queued within ``window`` seconds of each other (up to ``batch_size``) share
+    one ``encode`` call. The worker task is started on first use, on the
+    running event loop.
+    """
+    
+    def __init__(self, batch_size: int = EMBEDDING_BATCH_SIZE, window: float = EMBEDDING_BATCH_WINDOW):
+        self.batch_size = batch_size
+        self.window = window
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    async def embed(self, text: str) -> Any:
+        """Return the normalized float32 embedding of ``text``"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run())
+        
+        future = loop.create_future()
+        self._queue.put_nowait((text, future))
+        return await future
+    
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            try:
+                embeddings = await asyncio.to_thread(
+                    get_encoder().encode, [text for text, _ in batch], normalize_embeddings=True
+                )
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            
+            for (_, future), embedding in zip(batch, embeddings.astype(np.float32)):
+                if not future.done():
+                    future.set_result(embedding)
+
+
+class LLMResponseCache:
+    """Two-tier cache of stage outputs: exact prompt hash, then embedding similarity
+    
+    Exact hits are looked up by the SHA-256 of the full prompt. On an exact miss,
+    and when ``sentence_transformers`` is installed, the prompt is embedded and
+    compared against the stage's stored embeddings; a cosine similarity of at
+    least ``threshold`` reuses that prompt's output. Recent exact hits are also
+    kept in a small in-process LRU.
+    
+    Each stage's embeddings live in a Redis hash, with a sorted set recording
+    when each was stored. Entries older than ``ttl``, whose outputs have
+    expired, and the oldest past ``max_entries`` are evicted, so a lookup
+    transfers a bounded index.
+    """
+    
+    def __init__(
+        self,
+        client: Any = None,
+        ttl: int = RESPONSE_CACHE_TTL,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        local_size: int = 1024,
+        max_entries: int = SEMANTIC_INDEX_MAX_ENTRIES
+    ):
+        self.client = client
+        self.ttl = ttl
+        self.threshold = threshold
+        self.local_size = local_size
+        self.max_entries = max_entries
+        # key -> (time stored, output), least recently used first
+        self._local: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+    
+    @property
+    def semantic_enabled(self) -> bool:
+        return self.client is not None and SentenceTransformer is not None
+    
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        """Return the exact-match key for a prompt made of ``parts``"""
+        return sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+    
+    async def lookup(self, stage: str, key: str, text: str) -> Tuple[Optional[str], Any]:
+        """Return ``(cached output or None, embedding of text or None)``
+        
+        The embedding is returned so a miss can be stored without re-encoding.
+        """
+        local = self._local.get(key)
+        if local is not None:
+            stored_at, output = local
+            if time.monotonic() - stored_at <= self.ttl:
+                self._local.move_to_end(key)
+                return output, None
+            del self._local[key]
+        if self.client is None:
+            return None, None
+        
+        embedding = None
+        try:
+            cached = await self.client.get(f"ai:llm:{key}")
+            if cached is None and self.semantic_enabled:
+                embedding = await self._embed(text)
+                for match in await self._nearest(stage, embedding):
+                    cached = await self.client.get(f"ai:llm:{match}")
+                    if cached is not None:
+                        break
+                    # Its output expired; drop it so it cannot shadow live neighbours
+                    await self._forget(stage, match)
+            if cached is not None:
+                output = cached.decode("utf-8")
+                self._remember(key, output)
+                return output, embedding
+        except Exception as e:
+            logger.warning("LLM response cache lookup failed: %s", e)
+        return None, embedding
+    
+    async def store(self, stage: str, key: str, text: str, output: str, embedding: Any = None) -> None:
+        """Cache ``output`` for the prompt identified by ``key``"""
+        self._remember(key, output)
+        if self.client is None:
+            return
+        
+        try:
+            await self.client.setex(f"ai:llm:{key}", self.ttl, output)
+            if self.semantic_enabled:
+                if embedding is None:
+                    embedding = await self._embed(text)
+                await self._index(stage, key, embedding)
+        except Exception as e:
+            logger.warning("LLM response cache store failed: %s", e)
+    
+    def _remember(self, key: str, output: str) -> None:
+        self._local[key] = (time.monotonic(), output)
+        self._local.move_to_end(key)
+        if len(self._local) > self.local_size:
+            self._local.popitem(last=False)
+    
+    async def _embed(self, text: str) -> Any:
+        return await embedding_batcher.embed(text)
+    
+    @staticmethod
+    def _index_keys(stage: str) -> Tuple[str, str]:
+        # Hash of key -> embedding bytes, and sorted set of key -> time stored
+        return f"ai:llm:emb:{stage}", f"ai:llm:emb:{stage}:stored"
+    
+    async def _index(self, stage: str, key: str, embedding: Any) -> None:
+        index, stored = self._index_keys(stage)
+        now = time.time()
+        await self.client.hset(index, key, embedding.tobytes())
+        await self.client.zadd(stored, {key: now})
+        
+        # The oldest entries go first: those past the TTL, then any beyond the cap
+        total = await self.client.zcard(stored)
+        expired = await self.client.zcount(stored, "-inf", now - self.ttl)
+        evict = max(expired, total - self.max_entries)
+        if evict > 0:
+            await self._forget(stage, *await self.client.zrange(stored, 0, evict - 1))
+        
+        await self.client.expire(index, self.ttl)
+        await self.client.expire(stored, self.ttl)
+    
+    async def _forget(self, stage: str, *keys: Any) -> None:
+        index, stored = self._index_keys(stage)
+        await self.client.hdel(index, *keys)
+        await self.client.zrem(stored, *keys)
+    
+    async def _nearest(self, stage: str, embedding: Any) -> List[str]:
+        """Return the keys of the closest live entries above the threshold, best first"""
+        index, stored = self._index_keys(stage)
+        keys = await self.client.zrangebyscore(stored, time.time() - self.ttl, "+inf")
+        if not keys:
+            return []
+        vectors = await self.client.hmget(index, keys)
+        entries = [(key, vector) for key, vector in zip(keys, vectors) if vector is not None]
+        if not entries:
+            return []
+        # The similarity scan is CPU-bound, so it runs off the event loop
+        return await asyncio.to_thread(self._rank, entries, embedding)
+    
+    def _rank(self, entries: List[Tuple[bytes, bytes]], embedding: Any) -> List[str]:
+        matrix = np.frombuffer(b"".join(vector for _, vector in entries), dtype=np.float32)
+        # Embeddings are normalized, so the dot product is the cosine similarity
+        scores = matrix.reshape(len(entries), -1) @ embedding
+        best = np.argsort(scores)[::-1][:SEMANTIC_CANDIDATES]
+        return [entries[i][0].decode("utf-8") for i in best if scores[i] >= self.threshold]
+
+
+embedding_batcher = EmbeddingBatcher()
+response_cache = LLMResponseCache(redis_client)
\ No newline at end of file
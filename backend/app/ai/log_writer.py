@@ -0,0 +1,272 @@
+"""Background writer that keeps LLM log inserts off the request path"""
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+import asyncio
+import logging
+import os
+import orjson
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.db import AsyncSessionLocal, SessionLocal
+from app.models import LLMInputLog, LLMProcessingLog
+
+logger = logging.getLogger(__name__)
+
+# A batch is written once it holds this many records or its flush interval elapses
+LOG_BATCH_SIZE = int(os.getenv("AI_LOG_BATCH_SIZE", "100"))
+LOG_FLUSH_INTERVAL = float(os.getenv("AI_LOG_FLUSH_INTERVAL", "0.1"))
+
+# Records held while the database falls behind; past that, "drop_oldest" or "drop_newest"
+LOG_QUEUE_MAXSIZE = int(os.getenv("AI_LOG_QUEUE_MAXSIZE", "10000"))
+LOG_QUEUE_OVERFLOW = os.getenv("AI_LOG_QUEUE_OVERFLOW", "drop_oldest")
+
+# Stored for the parameters/context columns when a call has none
+_EMPTY_JSON = "{}"
+
+
+def _dump_json(value: Optional[Dict[str, Any]]) -> str:
+    return orjson.dumps(value, default=str).decode() if value else _EMPTY_JSON
+
+
+def build_log_record(
+    user_id: Any,
+    session_id: str,
+    input_text: str,
+    input_type: str,
+    output_text: Optional[str] = None,
+    status: str = "processing",
+    error_message: Optional[str] = None,
+    processing_time_ms: Optional[int] = None,
+    tokens_used: Optional[int] = None,
+    cost: Optional[float] = None,
+    parameters: Optional[Dict[str, Any]] = None,
+    context: Optional[Dict[str, Any]] = None,
+    stage: Optional[str] = None
+) -> Dict[str, Any]:
+    """Return the input log row, plus a processing log row on failure, for one LLM interaction
+    
+    Both rows are keyed by the column names of ``llm_input_log`` and
+    ``llm_processing_log``; the processing row's ``input_id`` is filled in
+    once the input row has been inserted.
+    """
+    record: Dict[str, Any] = {
+        "input": {
+            "user_id": user_id,
+            "session_id": session_id,
+            "stage": stage,
+            "input_text": input_text,
+            "input_type": input_type,
+            "model_name": "gpt-4o-mini",  # Default model
+            "parameters": _dump_json(parameters),
+            "context_json": _dump_json(context),
+            "output_text": output_text,
+            "status": status,
+            "processing_time_ms": processing_time_ms,
+            "tokens_used": tokens_used,
+            "cost": cost
+        },
+        "processing": None
+    }
+    # The input row carries the outcome; only failures get a processing row
+    if error_message is not None:
+        record["processing"] = {
+            "step": "llm_call",
+            "error": error_message,
+            "raw_output": output_text
+        }
+    return record
+
+
+def check_columns(table: Any, rows: List[Dict[str, Any]]) -> None:
+    """Raise ValueError if any row has a key that is not a column of ``table``
+    
+    Core inserts ignore unknown keys, so without this a renamed or missing
+    column would silently drop data instead of failing.
+    """
+    unknown = set().union(*rows).difference(table.c.keys())
+    if unknown:
+        raise ValueError(f"Unknown {table.name} columns: {', '.join(sorted(unknown))}")
+
+
+def insert_llm_logs(session: Session, records: List[Dict[str, Any]]) -> None:
+    """Insert log records with Core statements, without committing"""
+    if not records:
+        return
+    
+    input_log_table = LLMInputLog.__table__
+    input_rows = [record["input"] for record in records]
+    failure_rows = [record["processing"] for record in records if record["processing"] is not None]
+    # Checked up front so a mismatch fails before anything is inserted
+    check_columns(input_log_table, input_rows)
+    check_columns(LLMProcessingLog.__table__, failure_rows)
+    
+    # Append-only logs skip the ORM unit of work. Ids are only needed to link
+    # failure rows, and come back in parameter order to line up with ``records``
+    if not failure_rows:
+        session.execute(insert(input_log_table), input_rows)
+        return
+    
+    input_log_ids = session.execute(
+        insert(input_log_table).returning(input_log_table.c.id, sort_by_parameter_order=True),
+        input_rows
+    ).scalars().all()
+    
+    processing_rows = [
+        {**record["processing"], "input_id": input_log_id}
+        for input_log_id, record in zip(input_log_ids, records)
+        if record["processing"] is not None
+    ]
+    session.execute(insert(LLMProcessingLog.__table__), processing_rows)
+
+
+async def copy_llm_input_logs(session: Any, records: List[Dict[str, Any]]) -> None:
+    """Write success-only records with COPY over the session's asyncpg connection"""
+    input_log_table = LLMInputLog.__table__
+    input_rows = [record["input"] for record in records]
+    # COPY names its columns explicitly, so a stray key would fail the whole batch
+    check_columns(input_log_table, input_rows)
+    present = set().union(*input_rows)
+    columns = [name for name in input_log_table.c.keys() if name in present and name != "created_at"]
+    # COPY skips the column's Python-side default, so the timestamp is set here
+    created_at = datetime.utcnow()
+    
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        input_log_table.name,
+        columns=[*columns, "created_at"],
+        records=[(*(row.get(column) for column in columns), created_at) for row in input_rows]
+    )
+
+
+class LLMLogWriter:
+    """Queues log records and writes them in batches from a background task"""
+    
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        batch_size: int = LOG_BATCH_SIZE,
+        flush_interval: float = LOG_FLUSH_INTERVAL,
+        async_session_factory: Optional[Callable[[], Any]] = AsyncSessionLocal,
+        max_queue_size: int = LOG_QUEUE_MAXSIZE,
+        overflow: str = LOG_QUEUE_OVERFLOW
+    ):
+        self.session_factory = session_factory
+        # None for SQLite, which has no async driver; batches then go through a thread
+        self.async_session_factory = async_session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue_size = max_queue_size
+        self.overflow = overflow
+        self.dropped = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def start(self) -> None:
+        """Start the writer task on the running event loop"""
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._task = self._loop.create_task(self._run())
+    
+    async def stop(self) -> None:
+        """Write every queued record, then stop the writer task"""
+        if self._task is None:
+            return
+        # Records logged while draining are written directly
+        self._loop = None
+        # The sentinel sits behind every queued record, so the queue drains first
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+        self._queue = None
+    
+    def enqueue(self, record: Dict[str, Any]) -> None:
+        """Queue a record built by :func:`build_log_record`
+        
+        Outside the writer's event loop (scripts, worker threads, or before
+        startup) the record is written immediately instead, in the default
+        executor when another loop is running so the insert never blocks it.
+        When the queue is full, the oldest or the new record is dropped, per
+        ``overflow``.
+        """
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        
+        if self._queue is None or running_loop is not self._loop:
+            if running_loop is None:
+                self._write([record])
+            else:
+                running_loop.run_in_executor(None, self._write, [record])
+            return
+        
+        if self._queue.full():
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning("LLM log queue full, %d records dropped so far", self.dropped)
+            if self.overflow != "drop_oldest":
+                return
+            self._queue.get_nowait()
+        self._queue.put_nowait(record)
+    
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        
+        while not stopping:
+            record = await self._queue.get()
+            if record is None:
+                break
+            
+            records = [record]
+            deadline = loop.time() + self.flush_interval
+            while len(records) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    record = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if record is None:
+                    stopping = True
+                    break
+                records.append(record)
+            
+            await self._write_batch(records)
+    
+    async def _write_batch(self, records: List[Dict[str, Any]]) -> None:
+        if self.async_session_factory is None:
+            await asyncio.to_thread(self._write, records)
+            return
+        
+        async with self.async_session_factory() as session:
+            try:
+                # Only failures need ids back to link their processing rows
+                if all(record["processing"] is None for record in records):
+                    await copy_llm_input_logs(session, records)
+                else:
+                    await session.run_sync(insert_llm_logs, records)
+                await session.commit()
+            except Exception as e:
+                await session.rollback()
+                logger.error("Failed to write %d LLM log records: %s", len(records), e)
+    
+    def _write(self, records: List[Dict[str, Any]]) -> None:
+        session = self.session_factory()
+        try:
+            insert_llm_logs(session, records)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error("Failed to write %d LLM log records: %s", len(records), e)
+        finally:
+            session.close()
+
+
+log_writer = LLMLogWriter()
\ No newline at end of file
@@ -1,46 +1,61 @@
 """AI Service Manager for coordinating all stage services"""
-from typing import Dict, Any, Type
+import asyncio
+import uuid
+from typing import AsyncIterator, Dict, Any, List, Optional, Type, Union
 from sqlmodel import Session
 
 from app.models import Idea, User
-from app.ai.base import AIService
+from app.ai.base import AIService, STAGE_BATCH_CONCURRENCY
 from app.ai.stages.suggested import SuggestedService
-from app.ai.stages.deep_dive import DeepDiveService
 from app.ai.stages.iterating import IteratingService
-from app.ai.stages.considering import ConsideringService
-from app.ai.stages.building import BuildingService
-from app.ai.stages.closed import ClosedService
+from app.ai.stages.generic import GenericStageService, StageConfig
+from app.ai.stages.deep_dive import DEEP_DIVE_STAGE
+from app.ai.stages.considering import CONSIDERING_STAGE
+from app.ai.stages.building import BUILDING_STAGE
+from app.ai.stages.closed import CLOSED_STAGE
+
+# Stages whose batches pack several ideas into each prompt; the others run one call per idea
+ROW_BATCHED_STAGES = frozenset({"considering", "building", "closed"})
 
 
 class AIServiceManager:
     """Manager class for coordinating AI services across different stages"""
     
-    # Map stage names to service classes
-    STAGE_SERVICES: Dict[str, Type[AIService]] = {
+    __slots__ = ("session", "session_id", "_services")
+    
+    # Map stage names to service classes, or to the config of a generic stage
+    STAGE_SERVICES: Dict[str, Union[Type[AIService], StageConfig]] = {
         "suggested": SuggestedService,
-        "deep_dive": DeepDiveService,
+        "deep_dive": DEEP_DIVE_STAGE,
         "iterating": IteratingService,
-        "considering": ConsideringService,
-        "building": BuildingService,
-        "closed": ClosedService,
+        "considering": CONSIDERING_STAGE,
+        "building": BUILDING_STAGE,
+        "closed": CLOSED_STAGE,
     }
     
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, session_id: Optional[str] = None):
         self.session = session
-        self._services: Dict[str, AIService] = {}
+        # One manager serves one request, so its services share a log session id
+        self.session_id = session_id or uuid.uuid4().hex
+        # Built up front so no request pays the DSPy/LLMCenter setup for its stage
+        self._services: Dict[str, AIService] = {
+            stage: self._build_service(service_spec)
+            for stage, service_spec in self.STAGE_SERVICES.items()
+        }
+    
+    def _build_service(self, service_spec: Union[Type[AIService], StageConfig]) -> AIService:
+        if isinstance(service_spec, StageConfig):
+            return GenericStageService(self.session, service_spec, self.session_id)
+        return service_spec(self.session, self.session_id)
     
     def get_service(self, stage: str) -> AIService:
         """Get the AI service for a specific stage"""
         if stage not in self._services:
-            if stage not in self.STAGE_SERVICES:
-                raise ValueError(f"Unknown stage: {stage}")
-            
-            service_class = self.STAGE_SERVICES[stage]
-            self._services[stage] = service_class(self.session)
+            raise ValueError(f"Unknown stage: {stage}")
         
         return self._services[stage]
     
-    def process_idea_stage(
+    async def process_idea_stage(
         self, 
         idea: Idea, 
         user: User, 
@@ -59,13 +74,73 @@ class AIServiceManager:
             Dict containing the processing results
         """
         service = self.get_service(stage)
-        return service.process_stage(idea, user, **kwargs)
+        return await service.process_stage(idea, user, **kwargs)
+    
+    async def stream_idea_stage(
+        self, 
+        idea: Idea, 
+        user: User, 
+        stage: str, 
+        **kwargs
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Process an idea for a stage, streaming the AI output
+        
+        Suitable for a FastAPI ``StreamingResponse`` (one JSON frame per line):
+        chunk frames carry partial output, and the last frame carries the result,
+        including the stored artifact's id.
+        """
+        service = self.get_service(stage)
+        async for frame in service.stream_stage(idea, user, **kwargs):
+            yield frame
+    
+    async def process_idea_stages_batch(
+        self,
+        ideas: List[Idea],
+        user: User,
+        stage: str,
+        **kwargs
+    ) -> List[Dict[str, Any]]:
+        """Process several ideas for the same stage concurrently
+        
+        Ideas in a row-batched stage are packed into shared prompts by
+        :meth:`AIService.aprocess_stage_batch`; other stages make one call per idea.
+        
+        Args:
+            ideas: The ideas to process
+            user: The user requesting the processing
+            stage: The stage to process (suggested, deep_dive, etc.)
+            **kwargs: Stage-specific parameters applied to every idea
+            
+        Returns:
+            List of processing results, in the same order as ``ideas``
+        """
+        service = self.get_service(stage)
+        
+        if stage in ROW_BATCHED_STAGES:
+            try:
+                return await service.aprocess_stage_batch(ideas, user, **kwargs)
+            except Exception as e:
+                return [{"success": False, "stage": stage, "error": str(e)} for _ in ideas]
+        
+        semaphore = asyncio.Semaphore(STAGE_BATCH_CONCURRENCY)
+        
+        async def run(idea: Idea) -> Dict[str, Any]:
+            async with semaphore:
+                return await service.process_stage(idea, user, **kwargs)
+        
+        results = await asyncio.gather(*(run(idea) for idea in ideas), return_exceptions=True)
+        
+        return [
+            {"success": False, "stage": stage, "error": str(result)}
+            if isinstance(result, BaseException) else result
+            for result in results
+        ]
     
     def get_available_stages(self) -> list[str]:
         """Get list of available stages"""
         return list(self.STAGE_SERVICES.keys())
     
-    def trigger_stage_transition(
+    async def trigger_stage_transition(
         self, 
         idea: Idea, 
         user: User, 
@@ -86,7 +161,7 @@ class AIServiceManager:
             Dict containing the transition results
         """
         # Process the new stage
-        result = self.process_idea_stage(idea, user, to_stage, **kwargs)
+        result = await self.process_idea_stage(idea, user, to_stage, **kwargs)
         
         # Add transition metadata
         result["transition"] = {
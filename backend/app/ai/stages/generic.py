@@ -0,0 +1,172 @@
+"""Config-driven AI service shared by the single-artifact stages"""
+from dataclasses import dataclass, field
+from string import Formatter
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+import time
+from sqlmodel import Session
+
+from app.models import Idea, User
+from app.ai.base import AIService, StageProcessor, get_stage_processor
+from app.ai.cache import memoize_stage
+
+
+@dataclass(frozen=True)
+class StageConfig:
+    """Everything that distinguishes one single-artifact stage from another
+    
+    Attributes:
+        stage_name: Stage key, as used by ``AIServiceManager.STAGE_SERVICES``
+        display_name: Stage name shown to the model
+        custom_instructions: Extra instructions for the stage processor
+        system_prefix: Static instructions sent ahead of the per-call input
+        context_template: ``str.format`` template for the per-call stage context
+        input_template: ``str.format`` template for the logged input text
+        input_type: Input type recorded in the LLM logs
+        artifact_model: Model persisted for each processed idea
+        artifact_create_model: Create schema the artifact is built from
+        artifact_fields_from_ai: Maps ``(idea, ai_output)`` to create-schema fields
+        result_id_key: Result key under which the artifact id is returned
+        artifact_extra: Additional fixed fields set on every artifact
+        requires_stage_input: Skip the LLM call when every context field is blank
+        author_field: Artifact column set to the requesting user's id, if any
+        raw_output_field: Artifact column storing the raw model output, if any
+    """
+    stage_name: str
+    display_name: str
+    custom_instructions: str
+    system_prefix: str
+    context_template: str
+    input_template: str
+    input_type: str
+    artifact_model: Type[Any]
+    artifact_create_model: Type[Any]
+    artifact_fields_from_ai: Callable[[Idea, str], Dict[str, Any]]
+    result_id_key: str
+    artifact_extra: Dict[str, Any] = field(default_factory=dict)
+    requires_stage_input: bool = True
+    author_field: Optional[str] = None
+    raw_output_field: Optional[str] = "llm_raw_response"
+    
+    @property
+    def context_fields(self) -> Tuple[str, ...]:
+        """Stage-specific keyword arguments referenced by the context template"""
+        return tuple(
+            name for _, name, _, _ in Formatter().parse(self.context_template) if name
+        )
+
+
+class GenericStageService(AIService):
+    """AI service for any stage described by a :class:`StageConfig`"""
+    
+    # Per-instance slots shadow the AIService class-level defaults
+    __slots__ = ("config", "input_type", "result_id_key", "_context_fields")
+    
+    def __init__(self, session: Session, config: StageConfig, session_id: Optional[str] = None):
+        # The processor is built in AIService.__init__, which needs the config
+        self.config = config
+        self.input_type = config.input_type
+        self.result_id_key = config.result_id_key
+        self._context_fields = config.context_fields
+        super().__init__(session, session_id)
+    
+    def get_stage_name(self) -> str:
+        return self.config.stage_name
+    
+    def _stage_fields(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        return {name: kwargs.get(name, "") for name in self._context_fields}
+    
+    def has_stage_input(self, **kwargs) -> bool:
+        if not self.config.requires_stage_input:
+            return True
+        # With every field blank the prompt is pure boilerplate and the answer generic filler
+        return any(str(kwargs.get(name) or "").strip() for name in self._context_fields)
+    
+    def build_stage_context(self, **kwargs) -> str:
+        return self.config.context_template.format(**self._stage_fields(kwargs))
+    
+    def build_input_text(self, idea: Idea, **kwargs) -> str:
+        return self.config.input_template.format(
+            title=idea.title,
+            description=idea.description,
+            **self._stage_fields(kwargs)
+        )
+    
+    def create_processor(self) -> StageProcessor:
+        return get_stage_processor(
+            stage_name=self.config.display_name,
+            custom_instructions=self.config.custom_instructions,
+            system_prefix=self.config.system_prefix
+        )
+    
+    def build_artifact(self, idea: Idea, user: User, ai_output: str) -> Any:
+        config = self.config
+        artifact_data = config.artifact_create_model(**config.artifact_fields_from_ai(idea, ai_output))
+        
+        fields = {**artifact_data.model_dump(), "idea_id": idea.id, **config.artifact_extra}
+        if config.author_field:
+            fields[config.author_field] = user.id
+        if config.raw_output_field:
+            fields[config.raw_output_field] = ai_output
+        return config.artifact_model(**fields)
+    
+    @memoize_stage()
+    async def process_stage(self, idea: Idea, user: User, **kwargs) -> Dict[str, Any]:
+        """Process an idea in the configured stage
+        
+        Args:
+            idea: The idea to process
+            user: The user requesting the analysis
+            **kwargs: Stage-specific fields referenced by the context template
+        """
+        if not self.has_stage_input(**kwargs):
+            return self.insufficient_input_result()
+        
+        start_ns = time.perf_counter_ns()
+        
+        # Prepare the prompt context
+        stage_context = self.build_stage_context(**kwargs)
+        input_text = self.build_input_text(idea, **kwargs)
+        
+        try:
+            ai_output = await self.generate_output(idea, stage_context)
+            
+            processing_time = (time.perf_counter_ns() - start_ns) // 1_000_000
+            
+            # Log the interaction and store the artifact
+            self.log_llm_interaction(
+                user=user,
+                input_text=input_text,
+                input_type=self.input_type,
+                output_text=ai_output,
+                status="completed",
+                processing_time_ms=processing_time
+            )
+            artifact_ids = await self.save_artifacts(self.build_artifact(idea, user, ai_output))
+            
+            return {
+                "success": True,
+                "stage": self.get_stage_name(),
+                "ai_output": ai_output,
+                self.result_id_key: artifact_ids[0],
+                "processing_time_ms": processing_time
+            }
+        
+        except Exception as e:
+            processing_time = (time.perf_counter_ns() - start_ns) // 1_000_000
+            
+            # Log the error
+            self.log_llm_interaction(
+                user=user,
+                input_text=input_text,
+                input_type=self.input_type,
+                status="failed",
+                error_message=str(e),
+                processing_time_ms=processing_time
+            )
+            
+            return {
+                "success": False,
+                "stage": self.get_stage_name(),
+                "error": str(e),
+                "processing_time_ms": processing_time
+            }
\ No newline at end of file
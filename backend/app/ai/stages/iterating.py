@@ -1,19 +1,56 @@
 """AI service for the Iterating stage"""
 from typing import Any, Dict
-import json
 import time
 
-from app.models import Idea, User, Iterating, IteratingCreate, Iteration, IterationCreate
-from app.ai.base import AIService, StageProcessor
+from app.models import Idea, User, Iterating, Iteration
+from app.types import IteratingCreate, IterationCreate
+from app.ai.base import AIService, StageProcessor, get_stage_processor
+from app.ai.cache import memoize_stage
+
+# Static instructions sent ahead of the per-call input so providers can cache the prefix
+STAGE_CONTEXT_PREFIX = """You are helping to iterate and refine an idea. Your task is to:
+1. Evaluate the current iteration and progress
+2. Analyze feedback and identify key insights
+3. Suggest specific improvements and refinements
+4. Prioritize iteration goals and next steps
+5. Identify potential blockers and solutions
+6. Recommend testing and validation approaches
+
+Please provide:
+- Iteration Assessment: Analysis of current progress
+- Feedback Analysis: Key insights from feedback
+- Improvement Suggestions: Specific actionable improvements
+- Priority Recommendations: What to focus on next
+- Blocker Identification: Potential obstacles and solutions
+- Testing Strategy: How to validate improvements
+"""
+
+# Built once at import; only the stage-specific fields are filled in per call
+STAGE_CONTEXT_TEMPLATE = """
+        Current context:
+        Current Iteration: {current_iteration}
+        Feedback Received: {feedback}
+        Iteration Goals: {goals}
+        """
 
 
 class IteratingService(AIService):
     """AI service for processing ideas in the Iterating stage"""
     
+    __slots__ = ()
+    
     def get_stage_name(self) -> str:
         return "iterating"
     
-    def process_stage(
+    def create_processor(self) -> StageProcessor:
+        return get_stage_processor(
+            stage_name="Iterating",
+            custom_instructions="Focus on iterative improvement and actionable refinements.",
+            system_prefix=STAGE_CONTEXT_PREFIX
+        )
+    
+    @memoize_stage()
+    async def process_stage(
         self, 
         idea: Idea, 
         user: User, 
@@ -37,52 +74,22 @@ class IteratingService(AIService):
             feedback: Feedback received on current iteration
             goals: Goals for the next iteration
         """
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         
         # Prepare the prompt context
-        stage_context = f"""
-        You are helping to iterate and refine an idea. Your task is to:
-        1. Evaluate the current iteration and progress
-        2. Analyze feedback and identify key insights
-        3. Suggest specific improvements and refinements
-        4. Prioritize iteration goals and next steps
-        5. Identify potential blockers and solutions
-        6. Recommend testing and validation approaches
-        
-        Current context:
-        Current Iteration: {current_iteration}
-        Feedback Received: {feedback}
-        Iteration Goals: {goals}
-        
-        Please provide:
-        - Iteration Assessment: Analysis of current progress
-        - Feedback Analysis: Key insights from feedback
-        - Improvement Suggestions: Specific actionable improvements
-        - Priority Recommendations: What to focus on next
-        - Blocker Identification: Potential obstacles and solutions
-        - Testing Strategy: How to validate improvements
-        """
-        
-        # Create the stage processor
-        processor = StageProcessor(
-            stage_name="Iterating",
-            custom_instructions="Focus on iterative improvement and actionable refinements."
+        stage_context = STAGE_CONTEXT_TEMPLATE.format(
+            current_iteration=current_iteration,
+            feedback=feedback,
+            goals=goals
         )
+        # Built before the try so the error path always has it to log
+        input_text = f"Title: {idea.title}\nDescription: {idea.description}\nCurrent Iteration: {current_iteration}\nFeedback: {feedback}\nGoals: {goals}"
         
         try:
             # Process the idea
-            input_text = f"Title: {idea.title}\nDescription: {idea.description}\nCurrent Iteration: {current_iteration}\nFeedback: {feedback}\nGoals: {goals}"
-            
-            result = processor.forward(
-                idea_title=idea.title,
-                idea_description=idea.description,
-                stage_context=stage_context
-            )
+            ai_output = await self.generate_output(idea, stage_context)
             
-            processing_time = int((time.time() - start_time) * 1000)
-            
-            # Parse the AI output
-            ai_output = result.output if hasattr(result, 'output') else str(result)
+            processing_time = (time.perf_counter_ns() - start_ns) // 1_000_000
             
             # Log the interaction
             self.log_llm_interaction(
@@ -96,53 +103,50 @@ class IteratingService(AIService):
             
             # Store the iteration analysis in the database
             iterating_data = IteratingCreate(
-                current_stage="analysis",
-                progress_percentage=0.0,  # Will be updated based on actual progress
-                notes=ai_output,
-                next_steps=f"Follow AI recommendations for iteration improvement",
-                blockers=""  # Could extract from AI analysis
+                idea_id=idea.id,
+                data={
+                    "current_stage": "analysis",
+                    "progress_percentage": 0.0,  # Will be updated based on actual progress
+                    "notes": ai_output,
+                    "next_steps": "Follow AI recommendations for iteration improvement",
+                    "blockers": ""  # Could extract from AI analysis
+                },
+                version=1,
+                llm_raw_response=ai_output
             )
             
-            iterating_record = Iterating.model_validate(
-                iterating_data,
-                update={
-                    "idea_id": idea.id,
-                    "user_id": user.id
-                }
-            )
-            self.session.add(iterating_record)
+            iterating_record = Iterating(**iterating_data.model_dump())
             
             # Also create an iteration record
             iteration_data = IterationCreate(
-                title=f"AI Iteration Analysis - {idea.title}",
-                description=ai_output,
-                version=1,  # Could be incremented
-                status="active",
-                goals=goals,
-                outcomes=""  # Will be filled when iteration completes
+                idea_id=idea.id,
+                version="1",  # Could be incremented
+                risk_focus=feedback,
+                hypothesis=current_iteration,
+                method="AI iteration analysis",
+                tools=[],
+                task_list=[],
+                success_metric=goals,
+                target=goals,
+                confidence_score_before=0.0,
+                next_action="Follow AI recommendations for iteration improvement",
+                rationale=ai_output
             )
             
-            iteration = Iteration.model_validate(
-                iteration_data,
-                update={
-                    "idea_id": idea.id,
-                    "author_id": user.id
-                }
-            )
-            self.session.add(iteration)
-            self.session.commit()
+            iteration = Iteration(**iteration_data.model_dump())
+            iterating_id, iteration_id = await self.save_artifacts(iterating_record, iteration)
             
             return {
                 "success": True,
                 "stage": self.get_stage_name(),
                 "ai_output": ai_output,
-                "iterating_id": iterating_record.id,
-                "iteration_id": iteration.id,
+                "iterating_id": iterating_id,
+                "iteration_id": iteration_id,
                 "processing_time_ms": processing_time
             }
             
         except Exception as e:
-            processing_time = int((time.time() - start_time) * 1000)
+            processing_time = (time.perf_counter_ns() - start_ns) // 1_000_000
             
             # Log the error
             self.log_llm_interaction(
@@ -1,19 +1,46 @@
 """AI service for the Suggested stage"""
 from typing import Any, Dict
-import json
 import time
 
-from app.models import Idea, User, Suggested, SuggestedCreate
-from app.ai.base import AIService, StageProcessor
+from app.models import Idea, User, Suggested
+from app.types import SuggestedCreate
+from app.ai.base import AIService, StageProcessor, get_stage_processor
+from app.ai.cache import memoize_stage
+
+# Static instructions sent ahead of the per-call input so providers can cache the prefix
+STAGE_CONTEXT_PREFIX = """You are analyzing an idea in its initial "Suggested" stage. Your task is to:
+1. Provide a clear, concise summary of the idea
+2. Identify the core value proposition
+3. Suggest initial improvements or refinements
+4. Highlight potential challenges that should be considered
+5. Recommend immediate next steps for development
+
+Please structure your response as a JSON object with the following fields:
+- summary: A brief summary of the idea
+- value_proposition: The core value the idea provides
+- suggestions: List of improvement suggestions
+- challenges: List of potential challenges
+- next_steps: List of recommended next steps
+"""
 
 
 class SuggestedService(AIService):
     """AI service for processing ideas in the Suggested stage"""
     
+    __slots__ = ()
+    
     def get_stage_name(self) -> str:
         return "suggested"
     
-    def process_stage(self, idea: Idea, user: User, **kwargs) -> Dict[str, Any]:
+    def create_processor(self) -> StageProcessor:
+        return get_stage_processor(
+            stage_name="Suggested",
+            custom_instructions="Focus on initial idea evaluation and improvement suggestions.",
+            system_prefix=STAGE_CONTEXT_PREFIX
+        )
+    
+    @memoize_stage()
+    async def process_stage(self, idea: Idea, user: User, **kwargs) -> Dict[str, Any]:
         """Process an idea in the Suggested stage
         
         This stage:
@@ -22,45 +49,18 @@ class SuggestedService(AIService):
         - Identifies potential challenges and opportunities
         - Suggests next steps
         """
-        start_time = time.time()
-        
-        # Prepare the prompt context
-        stage_context = """
-        You are analyzing an idea in its initial "Suggested" stage. Your task is to:
-        1. Provide a clear, concise summary of the idea
-        2. Identify the core value proposition
-        3. Suggest initial improvements or refinements
-        4. Highlight potential challenges that should be considered
-        5. Recommend immediate next steps for development
-        
-        Please structure your response as a JSON object with the following fields:
-        - summary: A brief summary of the idea
-        - value_proposition: The core value the idea provides
-        - suggestions: List of improvement suggestions
-        - challenges: List of potential challenges
-        - next_steps: List of recommended next steps
-        """
+        start_ns = time.perf_counter_ns()
         
-        # Create the stage processor
-        processor = StageProcessor(
-            stage_name="Suggested",
-            custom_instructions="Focus on initial idea evaluation and improvement suggestions."
-        )
+        # The instructions all live in the cached system prefix
+        stage_context = ""
+        # Built before the try so the error path logs the same text
+        input_text = f"Title: {idea.title}\nDescription: {idea.description}"
         
         try:
             # Process the idea
-            input_text = f"Title: {idea.title}\nDescription: {idea.description}"
-            
-            result = processor.forward(
-                idea_title=idea.title,
-                idea_description=idea.description,
-                stage_context=stage_context
-            )
-            
-            processing_time = int((time.time() - start_time) * 1000)
+            ai_output = await self.generate_output(idea, stage_context)
             
-            # Parse the AI output
-            ai_output = result.output if hasattr(result, 'output') else str(result)
+            processing_time = (time.perf_counter_ns() - start_ns) // 1_000_000
             
             # Log the interaction
             self.log_llm_interaction(
@@ -74,40 +74,36 @@ class SuggestedService(AIService):
             
             # Store the suggestion in the database
             suggestion_data = SuggestedCreate(
-                entity_type="idea",
-                entity_id=idea.id,
-                suggestion_type="initial_analysis",
-                score=0.8,  # Default confidence score
-                reason=ai_output,
-                extra_data=json.dumps({
+                idea_id=idea.id,
+                data={
+                    "suggestion_type": "initial_analysis",
+                    "score": 0.8,  # Default confidence score
+                    "reason": ai_output,
                     "stage": "suggested",
                     "processing_time_ms": processing_time,
-                    "timestamp": time.time()
-                })
+                    "timestamp": time.time_ns()
+                },
+                llm_raw_response=ai_output
             )
             
-            suggestion = Suggested.model_validate(
-                suggestion_data,
-                update={"user_id": user.id}
-            )
-            self.session.add(suggestion)
-            self.session.commit()
+            suggestion = Suggested(**suggestion_data.model_dump())
+            suggestion_id = (await self.save_artifacts(suggestion))[0]
             
             return {
                 "success": True,
                 "stage": self.get_stage_name(),
                 "ai_output": ai_output,
-                "suggestion_id": suggestion.id,
+                "suggestion_id": suggestion_id,
                 "processing_time_ms": processing_time
             }
             
         except Exception as e:
-            processing_time = int((time.time() - start_time) * 1000)
+            processing_time = (time.perf_counter_ns() - start_ns) // 1_000_000
             
             # Log the error
             self.log_llm_interaction(
                 user=user,
-                input_text=f"Title: {idea.title}\nDescription: {idea.description}",
+                input_text=input_text,
                 input_type="idea_suggestion",
                 status="failed",
                 error_message=str(e),
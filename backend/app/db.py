@@ -1,4 +1,4 @@
-from database import SessionLocal, Base, sync_engine
+from database import SessionLocal, AsyncSessionLocal, Base, sync_engine
 
 engine = sync_engine  # Alias for clarity in main.py
 
@@ -1,7 +1,5 @@
 # lifecycle_map.py
 
-from watchdog.events import FileSystemEventHandler
-
 lifecycle_map = [
     {
         "stage": "suggested",
@@ -161,79 +159,124 @@ lifecycle_map = [
 ]
 
 # --- Live reload for development: auto-reload lifecycle_map on file changes ---
+import hashlib
 import os
-import threading
+import sys
 import time
-Observer = None
-FileSystemEvent = None
-try:
-    from watchdog.observers import Observer
-    from watchdog.events import FileSystemEventHandler, FileSystemEvent
-    watchdog_available = True
-except ImportError:
-    watchdog_available = False
+from types import MappingProxyType
+import orjson
 
 _lifecycle_map_cache = lifecycle_map
 
+# The route serves these pre-encoded bytes, so requests never re-serialize the map
+def _encode_lifecycle_map(lifecycle):
+    body = orjson.dumps({"lifecycle": lifecycle})
+    return body, f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+_lifecycle_map_bytes, _lifecycle_map_etag = _encode_lifecycle_map(_lifecycle_map_cache)
+
+# O(1) lookups by stage, API route and prompt; entries are read-only views
+def _build_indexes(lifecycle):
+    entries = [MappingProxyType(entry) for entry in lifecycle]
+    return (
+        {sys.intern(entry["stage"]): entry for entry in entries},
+        {entry["api_route"]: entry for entry in entries},
+        {entry["prompt"]: entry for entry in entries},
+    )
+
+_STAGE_INDEX, _ROUTE_INDEX, _PROMPT_INDEX = _build_indexes(_lifecycle_map_cache)
+
 # Function to reload the lifecycle_map
 def reload_lifecycle_map():
-    global _lifecycle_map_cache
+    global _lifecycle_map_cache, _lifecycle_map_bytes, _lifecycle_map_etag
+    global _STAGE_INDEX, _ROUTE_INDEX, _PROMPT_INDEX
     from importlib import reload
-    import sys
     if 'app.lifecycle_map' in sys.modules:
         reload(sys.modules['app.lifecycle_map'])
     # Re-import lifecycle_map
     from app.lifecycle_map import lifecycle_map as new_map
     _lifecycle_map_cache = new_map
+    _lifecycle_map_bytes, _lifecycle_map_etag = _encode_lifecycle_map(new_map)
+    _STAGE_INDEX, _ROUTE_INDEX, _PROMPT_INDEX = _build_indexes(new_map)
+
+# Editors fire several modify events per save; changes inside this window are coalesced
+RELOAD_DEBOUNCE_SECONDS = 0.2
+
+# Watchdog handler; built on demand so watchdog is only imported when watching
+def _make_handler():
+    from watchdog.events import PatternMatchingEventHandler
 
-# Watchdog handler
-class LifecycleMapChangeHandler(FileSystemEventHandler):
-    # pyright: ignore[reportImplicitOverride]
-    def on_modified(self, event):
-        if FileSystemEvent is not None and not isinstance(event, FileSystemEvent):
-            return
-        path = str(event.src_path)
-        if (
-            path.endswith("lifecycle_map.py")
-            or path.endswith(".md")
-            or path.endswith(".prompt")
-        ):
+    class LifecycleMapChangeHandler(PatternMatchingEventHandler):
+        def __init__(self):
+            super().__init__(patterns=["*lifecycle_map.py", "*.md", "*.prompt"], ignore_directories=True)
+            self._last = 0.0
+            self._hashes = {}
+
+        # pyright: ignore[reportImplicitOverride]
+        def on_modified(self, event):
+            now = time.monotonic()
+            if now - self._last < RELOAD_DEBOUNCE_SECONDS:
+                return
+            path = str(event.src_path)
+            try:
+                with open(path, "rb") as f:
+                    digest = hashlib.blake2b(f.read()).digest()
+            except OSError:
+                return
+            # Touches and metadata-only writes leave the content, and the map, unchanged
+            if self._hashes.get(path) == digest:
+                return
+            self._hashes[path] = digest
+            self._last = now
             print('[LifecycleMap] Detected change, reloading lifecycle_map...')
             _ = reload_lifecycle_map()
 
-# Start the watcher in a background thread (dev only)
+    return LifecycleMapChangeHandler()
+
+# Survives reload_lifecycle_map(), which re-executes this module, so only one watcher runs
+_observer = globals().get("_observer")
+
+# Start the watcher (dev only); the observer runs in its own daemon thread
 def start_lifecycle_map_watcher():
-    if not watchdog_available or Observer is None:
+    global _observer
+    if _observer is not None:
+        return
+    try:
+        from watchdog.observers import Observer
+    except ImportError:
         print('[LifecycleMap] Watchdog not installed, live reload disabled.')
         return
-    observer = Observer()
-    handler = LifecycleMapChangeHandler()
+    _observer = Observer()
     watch_dir = os.path.dirname(os.path.abspath(__file__))
-    _ = observer.schedule(handler, watch_dir, recursive=True)
-    observer.start()
+    _ = _observer.schedule(_make_handler(), watch_dir, recursive=True)
+    _observer.start()
     print(f'[LifecycleMap] Watching {watch_dir} for changes...')
-    # Keep thread alive
-    def keep_alive():
-        try:
-            while True:
-                time.sleep(1)
-        except KeyboardInterrupt:
-            observer.stop()
-        observer.join()
-    threading.Thread(target=keep_alive, daemon=True).start()
 
+# Production never sets the flag, so it never loads watchdog
 if os.environ.get('LIFECYCLE_DEV_WATCH', '0') == '1':
     start_lifecycle_map_watcher()
 
 def get_lifecycle_map():
     return _lifecycle_map_cache
 
+def get_stage(name):
+    return _STAGE_INDEX.get(name)
+
+def get_stage_by_route(api_route):
+    return _ROUTE_INDEX.get(api_route)
+
+def get_stage_by_prompt(prompt):
+    return _PROMPT_INDEX.get(prompt)
+
 # For FastAPI route
-from fastapi import APIRouter
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Request
+from fastapi.responses import Response
 
 router = APIRouter()
 
 @router.get("/lifecycle-map", tags=["lifecycle"])
-def lifecycle_map_route():
-    return JSONResponse(content={"lifecycle": lifecycle_map}) 
\ No newline at end of file
+def lifecycle_map_route(request: Request):
+    headers = {"ETag": _lifecycle_map_etag}
+    if request.headers.get("if-none-match") == _lifecycle_map_etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=_lifecycle_map_bytes, media_type="application/json", headers=headers)
\ No newline at end of file
@@ -14,20 +14,35 @@ import warnings
 import os
 import httpx
 import json
+import orjson
 import re
 import logging
 from typing import Dict, Any, Optional, Union, List
 import asyncio
 import time
-import traceback
-from jinja2 import Template
-from app.types import DeepDiveIdeaData, IteratingIdeaData, ConsideringIdeaData, DeepDiveCategoryData, IteratingExperiment
+import hashlib
+import functools
+import itertools
+import random
+import importlib.util
+from collections import OrderedDict
+from types import MappingProxyType
+from app.types import DeepDiveIdeaData, IteratingIdeaData, ConsideringIdeaData, DeepDiveCategoryData
 from app.utils.json_repair_util import repair_json_with_py, extract_json_from_llm_response
-from app.utils.context_utils import context_idea, context_user
+from app.llm_semcache import semantic_cache
 
 
 # Backward compatibility imports - DEPRECATED
-from app.llm_center.legacy_wrappers import *
+# The legacy wrappers pull in the whole LLM center, so they are imported on first
+# access (PEP 562) rather than with the module; names defined here take precedence
+def __getattr__(name: str) -> Any:
+    if name.startswith("__"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from app.llm_center import legacy_wrappers
+    try:
+        return getattr(legacy_wrappers, name)
+    except AttributeError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
 
 # Issue deprecation warning
 warnings.warn(
@@ -50,122 +65,388 @@ except ImportError:
 # Set up logging
 logger = logging.getLogger(__name__)
 
+def _json_loads(text: Union[str, bytes]) -> Any:
+    # orjson parses in C; the stdlib parser only sees what orjson rejects (e.g. NaN, huge ints)
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        return json.loads(text)
+
+# Patterns used by the response parsers, compiled once at import
+# Start of an array of objects, and the tokens _find_balanced steps through
+_JSON_ARRAY_START_RE = re.compile(r'\[\s*\{')
+_JSON_TOKEN_RE = re.compile(r'\\.|["{}\[\]]', re.DOTALL)
+_IDEA_SPLIT_RE = re.compile(r'\*\*Idea \d+|^Idea \d+|^\d+\. ', re.MULTILINE)
+_SCORE_RE = re.compile(r'(\d+)/10')
+# Section headers recognized by parse_by_headers, one alternative per format; match()
+# tries them in order at the start of the line, and only the matching one's group is set
+_HEADER_RE = re.compile(
+    r'#+\s*(.+)$'  # Markdown headers
+    r'|([A-Z][A-Za-z\s]+):\s*$'  # Title: format
+    r'|([A-Z][A-Za-z\s]+)\s*[-–—]\s*$'  # Title - format
+    r'|(\d+\.\s*[A-Z][A-Za-z\s]+)',  # 1. Title format
+    re.IGNORECASE
+)
+
 # Utility functions remove_emojis and truncate_with_ellipsis are defined here for use throughout llm.py
 
+_GROQ_KEY_NAME_RE = re.compile(r'GROQ_API_KEY_(\d+)$')
+
+@functools.lru_cache(maxsize=1)
 def _load_groq_keys():
-    # Collect all env vars that start with GROQ_API_KEY_
-    keys = []
+    # Collect all env vars that start with GROQ_API_KEY_, numbered keys first in numeric order,
+    # then any others by name; sort keys are computed once per var, not per comparison
+    numbered = []
+    named = []
     for k, v in os.environ.items():
-        if k.startswith("GROQ_API_KEY_") and v:
-            keys.append((k, v))
-    # Sort by number if possible
-    keys.sort(key=lambda x: int(x[0].split('_')[-1]) if x[0].split('_')[-1].isdigit() else x[0])
-    return [v for _, v in keys]
+        if not v or not k.startswith("GROQ_API_KEY_"):
+            continue
+        m = _GROQ_KEY_NAME_RE.match(k)
+        if m:
+            numbered.append((int(m.group(1)), v))
+        else:
+            named.append((k, v))
+    numbered.sort()
+    named.sort()
+    # A tuple is immutable, so every caller can share it
+    return tuple(v for _, v in numbered) + tuple(v for _, v in named)
 
 GROQ_API_KEYS = _load_groq_keys()
 if not GROQ_API_KEYS:
-    import warnings
     warnings.warn("No GROQ_API_KEY found in environment. LLM functionality will be limited.")
-    GROQ_API_KEYS = ["dummy_key"]  # Fallback for development/testing
+    GROQ_API_KEYS = ("dummy_key",)  # Fallback for development/testing
 
-_groq_key_counter = 0
-_groq_key_lock = asyncio.Lock()
+# Round-robin cursor over key indexes; next() on it is atomic, so callers need no lock
+_groq_key_iter = itertools.cycle(range(len(GROQ_API_KEYS)))
+# Monotonic time until which each key is rate limited, set from a 429's retry-after
+_key_cooldown = [0.0] * len(GROQ_API_KEYS)
 
 def _get_next_groq_key():
-    global _groq_key_counter
-    key = GROQ_API_KEYS[_groq_key_counter % len(GROQ_API_KEYS)]
-    _groq_key_counter += 1
-    return key
-
-async def call_groq(prompt: str, model: str = "moonshotai/kimi-k2-instruct"):
-    """Call Groq API with the given prompt, with retries, round robin keys, and longer timeout."""
-    logger.info(f"Calling Groq API with model={model}")
-    logger.debug(f"Prompt length: {len(prompt)} characters")
-    logger.debug(f"First 200 chars of prompt: {prompt[:200]}...")
+    # Next key in rotation that is not cooling down, or None when every key is
+    now = time.monotonic()
+    for _ in range(len(GROQ_API_KEYS)):
+        key_index = next(_groq_key_iter)
+        if _key_cooldown[key_index] <= now:
+            return key_index, GROQ_API_KEYS[key_index]
+    return None
+
+GROQ_TEMPERATURE = 0.7
+GROQ_MAX_TOKENS = 3000
+# Attempts per call_groq on network errors, and the ceiling in seconds of the backoff between them
+GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "3"))
+GROQ_BACKOFF_CAP = float(os.getenv("GROQ_BACKOFF_CAP", "30"))
+# 429s do not use up attempts; instead a call stops waiting for a free key after this many seconds
+GROQ_RATE_LIMIT_DEADLINE = float(os.getenv("GROQ_RATE_LIMIT_DEADLINE", "120"))
+
+class GroqRateLimitError(RuntimeError):
+    """Raised when every Groq key stays rate limited past GROQ_RATE_LIMIT_DEADLINE"""
+
+# Connections the pooled client may open, and how many it keeps alive between calls
+GROQ_MAX_CONNECTIONS = int(os.getenv("GROQ_MAX_CONNECTIONS", "100"))
+GROQ_MAX_KEEPALIVE = int(os.getenv("GROQ_MAX_KEEPALIVE", "50"))
+
+# Pooled client shared by every call_groq on the serving event loop, so the TLS
+# session to Groq stays warm; HTTP/2 (when h2 is installed) multiplexes concurrent calls
+_groq_client: Optional[httpx.AsyncClient] = None
+_groq_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def _get_groq_client() -> httpx.AsyncClient:
+    global _groq_client, _groq_client_loop
+    loop = asyncio.get_running_loop()
+    # A client's connections belong to the loop that opened them
+    if _groq_client is None or _groq_client_loop is not loop:
+        _groq_client = httpx.AsyncClient(
+            base_url="https://api.groq.com",
+            timeout=httpx.Timeout(60.0, connect=10.0),
+            limits=httpx.Limits(max_connections=GROQ_MAX_CONNECTIONS, max_keepalive_connections=GROQ_MAX_KEEPALIVE),
+            http2=importlib.util.find_spec("h2") is not None
+        )
+        _groq_client_loop = loop
+    return _groq_client
+
+async def close_groq_client() -> None:
+    """Close the pooled Groq client, if one was opened"""
+    global _groq_client, _groq_client_loop
+    client = _groq_client
+    if client is not None:
+        _groq_client = None
+        _groq_client_loop = None
+        await client.aclose()
+
+# Cooldown for a rate-limited key when the 429 gives no usable retry-after
+GROQ_DEFAULT_RETRY_AFTER = 10
+
+def _retry_after_seconds(value: Optional[str]) -> int:
+    # retry-after may be missing, or an HTTP date rather than seconds
+    if not value:
+        return GROQ_DEFAULT_RETRY_AFTER
+    try:
+        return int(float(value))
+    except ValueError:
+        return GROQ_DEFAULT_RETRY_AFTER
+
+# Concurrent requests per model and key; more than the keys can serve only turns into 429s
+GROQ_CONCURRENCY_PER_KEY = int(os.getenv("GROQ_CONCURRENCY_PER_KEY", "4"))
+_groq_semaphores: Dict[str, asyncio.Semaphore] = {}
+_groq_semaphores_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def _get_groq_semaphore(model: str) -> asyncio.Semaphore:
+    global _groq_semaphores_loop
+    loop = asyncio.get_running_loop()
+    # Like the client, a semaphore's waiters belong to one loop
+    if _groq_semaphores_loop is not loop:
+        _groq_semaphores.clear()
+        _groq_semaphores_loop = loop
+    semaphore = _groq_semaphores.get(model)
+    if semaphore is None:
+        semaphore = _groq_semaphores[model] = asyncio.Semaphore(len(GROQ_API_KEYS) * GROQ_CONCURRENCY_PER_KEY)
+    return semaphore
+
+# Exact-match cache of call_groq responses: repeats of a request within the TTL skip the API
+GROQ_CACHE_TTL = float(os.getenv("GROQ_CACHE_TTL", "3600"))
+GROQ_CACHE_MAX_ENTRIES = int(os.getenv("GROQ_CACHE_MAX_ENTRIES", "10000"))
+# key -> (time stored, content), least recently used first
+_RESPONSE_CACHE: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+_RESPONSE_CACHE_STATS = {"hits": 0, "semantic_hits": 0, "misses": 0}
+
+def _response_cache_key(prompt: str, model: str, system: Optional[str] = None) -> str:
+    payload = orjson.dumps(
+        {"m": model, "t": GROQ_TEMPERATURE, "mx": GROQ_MAX_TOKENS, "s": system, "p": prompt},
+        option=orjson.OPT_SORT_KEYS
+    )
+    return hashlib.sha256(payload).hexdigest()
+
+def _get_cached_response(key: str) -> Optional[str]:
+    # No awaits between lookup and update, so the event loop needs no lock here
+    entry = _RESPONSE_CACHE.get(key)
+    if entry is None:
+        return None
+    stored_at, content = entry
+    if time.monotonic() - stored_at > GROQ_CACHE_TTL:
+        del _RESPONSE_CACHE[key]
+        return None
+    _RESPONSE_CACHE.move_to_end(key)
+    return content
+
+def _cache_response(key: str, content: str) -> None:
+    _RESPONSE_CACHE[key] = (time.monotonic(), content)
+    _RESPONSE_CACHE.move_to_end(key)
+    if len(_RESPONSE_CACHE) > GROQ_CACHE_MAX_ENTRIES:
+        _RESPONSE_CACHE.popitem(last=False)
+
+async def call_groq(
+    prompt: str,
+    model: str = "moonshotai/kimi-k2-instruct",
+    system: Optional[str] = None,
+    no_cache: bool = False
+):
+    """Call Groq API with the given prompt, with retries, round robin keys, and longer timeout.
+
+    Static instructions belong in ``system``, which is sent as a separate message ahead
+    of ``prompt``: the provider's prompt cache only reuses an identical prefix, so the
+    per-call data must come last. Callers rendering a prompt template should pass its
+    fixed instructions as ``system`` and only the rendered user input as ``prompt``.
+
+    With ``no_cache`` the response caches are not consulted, forcing a fresh
+    generation; the new response still replaces the cached one.
+
+    A 429 parks its key and moves on to the next one without using up an attempt;
+    GroqRateLimitError is raised if no key is usable within GROQ_RATE_LIMIT_DEADLINE.
+    """
+    logger.info("Calling Groq API with model=%s", model)
+    logger.debug("Prompt length: %d characters", len(prompt))
+    logger.debug("First 200 chars of prompt: %.200s...", prompt)
     logger.debug("Call stack - this is call_groq entry point")
 
-    max_retries = 3
-    for attempt in range(1, max_retries + 1):
-        async with _groq_key_lock:
-            groq_key = _get_next_groq_key()
-            key_index = (_groq_key_counter-1)%len(GROQ_API_KEYS)
-        logger.info(f"[DEBUG] Using GROQ_API_KEY_{key_index+1}: length={len(groq_key)}, last4={groq_key[-4:]}")
+    cache_key = _response_cache_key(prompt, model, system)
+    cached = None if no_cache else _get_cached_response(cache_key)
+    if cached is not None:
+        _RESPONSE_CACHE_STATS["hits"] += 1
+        logger.info("Groq response cache hit (%d chars)", len(cached))
+        return cached
+
+    # Reworded prompts miss the exact cache; the semantic cache is best-effort
+    embedding = None
+    # Only prompts sent with the same model and instructions are comparable
+    semantic_namespace = model if system is None else f"{model}\x1f{system}"
+    if semantic_cache.enabled and not no_cache:
+        try:
+            similar, embedding = await semantic_cache.lookup(prompt, semantic_namespace)
+        except Exception as e:
+            logger.warning("Semantic cache lookup failed: %s", e)
+            similar = None
+        if similar is not None:
+            _RESPONSE_CACHE_STATS["semantic_hits"] += 1
+            logger.info("Groq semantic cache hit (%d chars)", len(similar))
+            _cache_response(cache_key, similar)
+            return similar
+    _RESPONSE_CACHE_STATS["misses"] += 1
+
+    messages = [{"role": "user", "content": prompt}]
+    if system is not None:
+        messages.insert(0, {"role": "system", "content": system})
+
+    max_retries = GROQ_MAX_RETRIES
+    deadline = time.monotonic() + GROQ_RATE_LIMIT_DEADLINE
+    attempt = 1
+    while True:
+        picked = _get_next_groq_key()
+        while picked is None:
+            wait = max(min(_key_cooldown) - time.monotonic(), 0.0)
+            if time.monotonic() + wait > deadline:
+                raise GroqRateLimitError(
+                    f"All Groq keys rate limited for another {wait:.1f} seconds, "
+                    f"past the {GROQ_RATE_LIMIT_DEADLINE:.0f} second deadline"
+                )
+            logger.warning("All Groq keys rate limited. Sleeping for %.1f seconds...", wait)
+            await asyncio.sleep(wait)
+            picked = _get_next_groq_key()
+        key_index, groq_key = picked
+        logger.debug("Using GROQ_API_KEY_%d: length=%d, last4=%s", key_index + 1, len(groq_key), groq_key[-4:])
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                logger.info(f"Attempt {attempt} - Making request to Groq API with key index {key_index}...")
+            client = _get_groq_client()
+            logger.info("Attempt %d - Making request to Groq API with key index %d...", attempt, key_index)
+            # Only the request holds a slot; cache lookups and backoff sleeps do not
+            async with _get_groq_semaphore(model):
                 response = await client.post(
-                    "https://api.groq.com/openai/v1/chat/completions",
+                    "/openai/v1/chat/completions",
                     json={
                         "model": model,
-                        "messages": [{"role": "user", "content": prompt}],
-                        "temperature": 0.7,
-                        "max_tokens": 3000
+                        "messages": messages,
+                        "temperature": GROQ_TEMPERATURE,
+                        "max_tokens": GROQ_MAX_TOKENS
                     },
                     headers={"Authorization": f"Bearer {groq_key}"}
                 )
-                logger.info(f"Response status: {response.status_code}")
-                logger.debug(f"Response headers: {dict(response.headers)}")
-                if response.status_code == 429:
-                    retry_after = int(float(response.headers.get('retry-after', 10)))
-                    logger.warning(f"Rate limited. Sleeping for {retry_after} seconds before retrying...")
-                    await asyncio.sleep(retry_after)
-                    continue
-                response.raise_for_status()
-                result = response.json()
-                logger.debug(f"Full API response: {result}")
-                content = result["choices"][0]["message"]["content"]
-                logger.info(f"Groq API call succeeded. Extracted content length: {len(content)}")
-                logger.debug(f"First 200 chars of content: {content[:200]}...")
-                return content
+            logger.info("Response status: %s", response.status_code)
+            logger.debug("Response headers: %s", response.headers)
+            if response.status_code == 429:
+                retry_after = _retry_after_seconds(response.headers.get('retry-after'))
+                # Park this key; another one may be usable right away
+                _key_cooldown[key_index] = time.monotonic() + retry_after
+                logger.warning("Rate limited on key index %d. Cooling it down for %d seconds...", key_index, retry_after)
+                if time.monotonic() >= deadline:
+                    raise GroqRateLimitError(f"Groq still rate limited after {GROQ_RATE_LIMIT_DEADLINE:.0f} seconds")
+                continue
+            response.raise_for_status()
+            result = response.json()
+            logger.debug("Full API response: %s", result)
+            content = result["choices"][0]["message"]["content"]
+            logger.info("Groq API call succeeded. Extracted content length: %d", len(content))
+            logger.debug("First 200 chars of content: %.200s...", content)
+            _cache_response(cache_key, content)
+            if embedding is not None:
+                semantic_cache.store(semantic_namespace, embedding, content)
+            return content
         except (httpx.ReadTimeout, httpx.ConnectTimeout, httpx.RequestError) as e:
-            logger.warning(f"Error in call_groq (attempt {attempt}): {e}")
-            logger.debug(f"Error type: {type(e)}")
+            logger.warning("Error in call_groq (attempt %d): %s", attempt, e)
+            logger.debug("Error type: %s", type(e))
             if attempt < max_retries:
-                logger.info("Retrying in 3 seconds...")
-                await asyncio.sleep(3)
+                # Full jitter, so calls that failed together do not retry together;
+                # the retry also moves on to the next key in rotation
+                backoff = min(GROQ_BACKOFF_CAP, 2 ** attempt) * random.random()
+                logger.info("Retrying in %.1f seconds...", backoff)
+                await asyncio.sleep(backoff)
+                attempt += 1
             else:
-                logger.error(f"All {max_retries} attempts failed.")
+                logger.error("All %d attempts failed.", max_retries)
                 raise
         except Exception as e:
-            logger.error(f"Non-retryable error in call_groq: {e}")
-            logger.debug(f"Error type: {type(e)}")
+            logger.error("Non-retryable error in call_groq: %s", e)
+            logger.debug("Error type: %s", type(e))
             raise
 
+# Hit/miss counters of the response cache, for observability
+call_groq.cache_stats = _RESPONSE_CACHE_STATS
+
+async def call_groq_many(prompts: List[str], model: str = "moonshotai/kimi-k2-instruct", system: Optional[str] = None) -> List[str]:
+    """Call Groq for every prompt concurrently, returning the responses in prompt order.
+
+    Concurrency is bounded per model by call_groq's semaphore, so a large batch
+    queues instead of flooding the API with requests that would be rate limited.
+    """
+    return list(await asyncio.gather(*(call_groq(prompt, model, system) for prompt in prompts)))
+
+def _find_balanced(text: str, start: int) -> Optional[str]:
+    # The JSON value opened by the bracket or brace at text[start], up to its matching
+    # close, or None if it never closes. Only quotes, escapes and brackets are visited,
+    # so the scan is linear where a lazy regex stops at the first closing bracket
+    depth = 0
+    in_string = False
+    for token in _JSON_TOKEN_RE.finditer(text, start):
+        char = token.group()
+        if char[0] == '\\':
+            continue
+        if char == '"':
+            in_string = not in_string
+        elif in_string:
+            continue
+        elif char in '{[':
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return text[start:token.end()]
+    return None
+
 def extract_json_array(text):
-    # Find the first JSON array in the text
-    match = re.search(r'\[\s*{.*?}\s*\]', text, re.DOTALL)
-    if match:
+    # Most responses are bare JSON, so try the whole text before searching it
+    stripped = text.strip()
+    parsed = None
+    if stripped[:1] in ('[', '{'):
         try:
-            return json.loads(match.group(0))
-        except Exception as e:
-            print(f'JSON parse error: {e}')
-            return None
-    # Fallback: try to parse the whole text
-    try:
-        return json.loads(text)
-    except Exception as e:
-        print(f'JSON parse error: {e}')
-        return None
+            parsed = _json_loads(stripped)
+        except Exception:
+            parsed = None
+        if isinstance(parsed, list):
+            return parsed
+    
+    # Then the span from the first '[' to the last ']', which drops any prose or code fence around the array
+    start = text.find('[')
+    end = text.rfind(']')
+    if start != -1 and end > start:
+        try:
+            return _json_loads(text[start:end + 1])
+        except Exception:
+            pass
+        # Brackets in the surrounding prose; take the first complete array of objects
+        match = _JSON_ARRAY_START_RE.search(text, start)
+        span = _find_balanced(text, match.start()) if match else None
+        if span is not None:
+            try:
+                return _json_loads(span)
+            except Exception as e:
+                logger.warning("JSON array parse error: %s", e)
+                return None
+    
+    # Fallback: the whole text, if it parsed
+    if parsed is None:
+        logger.debug("No JSON array found in %d characters of text", len(text))
+    return parsed
 
 # Utility: Insert placeholders for missing fields, including idea_number
 IDEA_REQUIRED_FIELDS = [
     'title', 'hook', 'value', 'evidence', 'differentiator', 'score', 'mvp_effort', 'type', 'assumptions', 'evidence_reference', 'repo_usage'
 ]
 
+# Compiled once; the character class is matched in C by the regex engine
+# Disjoint ranges, so each character is tested against as few bounds as possible
+# (dingbats 2702-27B0 and the flags fall inside 24C2-1F251)
+_EMOJI_RE = re.compile(
+    "["
+    "\U000024C2-\U0001F251"  # enclosed chars through flags (iOS), incl. dingbats
+    "\U0001F300-\U0001F64F"  # symbols & pictographs, emoticons
+    "\U0001F680-\U0001F6FF"  # transport & map symbols
+    "]+",
+    flags=re.UNICODE,
+)
+
 def remove_emojis(text: str) -> str:
     # Remove all emoji characters from the text
-    emoji_pattern = re.compile(
-        "["
-        "\U0001F600-\U0001F64F"  # emoticons
-        "\U0001F300-\U0001F5FF"  # symbols & pictographs
-        "\U0001F680-\U0001F6FF"  # transport & map symbols
-        "\U0001F1E0-\U0001F1FF"  # flags (iOS)
-        "\U00002702-\U000027B0"
-        "\U000024C2-\U0001F251"
-        "]+",
-        flags=re.UNICODE,
-    )
-    return emoji_pattern.sub(r"", text)
+    # Every range is above ASCII, so pure-ASCII text (most LLM output) is returned as is
+    if text.isascii():
+        return text
+    return _EMOJI_RE.sub("", text)
 
 def truncate_with_ellipsis(text: str, max_length: int = 120) -> str:
     if not isinstance(text, str):
@@ -175,125 +456,118 @@ def truncate_with_ellipsis(text: str, max_length: int = 120) -> str:
         return text[:max_length - 1].rstrip() + "…"
     return text
 
+# Values the LLM uses when it has no real source URL
+_PLACEHOLDER_URLS = frozenset(('N/A', 'example.com', 'http://example.com', 'https://example.com', '#'))
+
+# Optional fields every sanitized idea carries, None when the LLM left them out
+IDEA_OPTIONAL_FIELDS = (
+    "scope_commitment", "source_of_inspiration", "problem_statement",
+    "elevator_pitch", "core_assumptions", "riskiest_assumptions", "generation_notes"
+)
+
+# Defaults for required fields the LLM left empty. evidence_reference never has
+# a title once cleaned, so evidence always falls back to the placeholder
+_IDEA_FIXED_DEFAULTS = (
+    ("evidence", "Market research and validation needed"),
+    ("differentiator", "Unique competitive advantage to be defined"),
+    ("type", "side_hustle"),  # Default type
+    ("repo_usage", "AI-generated idea"),
+)
+
+# Fields shown in the debug dump of a sanitized idea
+_IDEA_DEBUG_FIELDS = (
+    "title", "hook", "score", "mvp_effort", "scope_commitment", "source_of_inspiration",
+    "problem_statement", "elevator_pitch", "core_assumptions", "riskiest_assumptions", "generation_notes"
+)
+
+def _coerce_int(value: Any, default: int = 5) -> int:
+    try:
+        return int(round(float(value)))
+    except Exception:
+        return default
+
+def _coerce_float(value: Any, default: float = 5.0) -> float:
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except Exception:
+        return default
+
 def sanitize_idea_fields(idea: Dict[str, Any]) -> Dict[str, Any]:
-    # Debug logging to track field mapping
-    logger = logging.getLogger(__name__)
+    get = idea.get
     # Remove source_of_inspiration if present
     idea.pop('source_of_inspiration', None)
     # Ensure evidence_reference is a dict and has stat+url
-    evref = idea.get('evidence_reference', {})
+    evref = get('evidence_reference', {})
     if not isinstance(evref, dict):
         evref = {}
-    stat = evref.get('stat', '').strip() if isinstance(evref.get('stat', ''), str) else ''
-    url = evref.get('url', '').strip() if isinstance(evref.get('url', ''), str) else ''
+    stat = evref.get('stat', '')
+    stat = stat.strip() if isinstance(stat, str) else ''
+    url = evref.get('url', '')
+    url = url.strip() if isinstance(url, str) else ''
     # Check for valid stat and url (not empty, not placeholder)
-    if not stat or not url or url in ('N/A', 'example.com', 'http://example.com', 'https://example.com', '#'):
-        logger.warning(f"[LLM VALIDATION] evidence_reference missing or invalid: {evref}")
-        idea['evidence_reference'] = {}
+    if not stat or not url or url in _PLACEHOLDER_URLS:
+        logger.warning("[LLM VALIDATION] evidence_reference missing or invalid: %s", evref)
+        evidence_reference = {}
     else:
-        idea['evidence_reference'] = {'stat': stat, 'url': url}
+        evidence_reference = {'stat': stat, 'url': url}
+    # Always a dict from here on
+    idea['evidence_reference'] = evidence_reference
     
     # Map new LLM fields to DB fields
     if "idea_name" in idea:
         idea["title"] = idea["idea_name"]
     if "overall_score" in idea:
-        try:
-            idea["score"] = int(round(float(idea["overall_score"])))
-        except Exception:
-            idea["score"] = 5
+        idea["score"] = _coerce_int(idea["overall_score"])
     if "effort_score" in idea:
-        try:
-            idea["mvp_effort"] = int(round(float(idea["effort_score"])))
-        except Exception:
-            idea["mvp_effort"] = 5
+        idea["mvp_effort"] = _coerce_int(idea["effort_score"])
     
     # Ensure hook field is present (required by validation)
-    if "hook" not in idea or not idea["hook"]:
+    if not get("hook"):
         # Try to create a hook from other fields
-        if idea.get("elevator_pitch"):
-            idea["hook"] = idea["elevator_pitch"][:100] + "..." if len(idea["elevator_pitch"]) > 100 else idea["elevator_pitch"]
-        elif idea.get("problem_statement"):
-            idea["hook"] = idea["problem_statement"][:100] + "..." if len(idea["problem_statement"]) > 100 else idea["problem_statement"]
+        source = get("elevator_pitch") or get("problem_statement")
+        if source:
+            idea["hook"] = source[:100] + "..." if len(source) > 100 else source
         else:
             idea["hook"] = "A compelling business opportunity"
     
-    # Ensure all required fields for validation are present
-    required_fields = {
-        "value": idea.get("elevator_pitch", "Value proposition to be defined"),
-        "evidence": idea.get("evidence_reference", {}).get("title", "Market research and validation needed"),
-        "differentiator": "Unique competitive advantage to be defined",
-        "type": "side_hustle",  # Default type
-        "assumptions": idea.get("core_assumptions", []),
-        "repo_usage": "AI-generated idea"
-    }
-    
-    # Set missing required fields
-    for field, default_value in required_fields.items():
-        if field not in idea or not idea[field]:
+    # Ensure all required fields for validation are present; the defaults taken
+    # from other fields are only looked up when the field is actually missing
+    if not get("value"):
+        idea["value"] = get("elevator_pitch", "Value proposition to be defined")
+    for field, default_value in _IDEA_FIXED_DEFAULTS:
+        if not get(field):
             idea[field] = default_value
+    if not get("assumptions"):
+        idea["assumptions"] = get("core_assumptions", [])
     
     # Add new fields if present
-    for field in [
-        "scope_commitment", "source_of_inspiration", "problem_statement",
-        "elevator_pitch", "core_assumptions", "riskiest_assumptions", "generation_notes"
-    ]:
-        if field in idea:
-            idea[field] = idea[field]
-            logger.info(f"🔍 [DEBUG] Found {field}: {idea[field]}")
-        else:
-            idea[field] = None
-            logger.info(f"🔍 [DEBUG] Missing {field}, setting to None")
+    for field in IDEA_OPTIONAL_FIELDS:
+        idea.setdefault(field, None)
     
     # Fallback for legacy fields
     if "title" in idea and "idea_name" not in idea:
         idea["idea_name"] = idea["title"]
     if "score" in idea and "overall_score" not in idea:
-        try:
-            score_val = idea["score"]
-            if score_val is not None:
-                idea["overall_score"] = float(score_val)
-            else:
-                idea["overall_score"] = 5.0
-        except Exception:
-            idea["overall_score"] = 5.0
+        idea["overall_score"] = _coerce_float(idea["score"])
     if "mvp_effort" in idea and "effort_score" not in idea:
-        try:
-            effort_val = idea["mvp_effort"]
-            if effort_val is not None:
-                idea["effort_score"] = float(effort_val)
-            else:
-                idea["effort_score"] = 5.0
-        except Exception:
-            idea["effort_score"] = 5.0
+        idea["effort_score"] = _coerce_float(idea["mvp_effort"])
     
-    # Ensure evidence_reference is always a dict
-    if "evidence_reference" in idea:
-        if idea["evidence_reference"] == "" or idea["evidence_reference"] is None:
-            idea["evidence_reference"] = {}
-        elif isinstance(idea["evidence_reference"], str):
-            # If it's a URL string, wrap it in a dict
-            idea["evidence_reference"] = {"url": idea["evidence_reference"], "stat": ""}
-    
-    # Debug logging of final sanitized idea
-    logger.info(f"🔍 [DEBUG] sanitize_idea_fields result keys: {list(idea.keys())}")
-    logger.info(f"🔍 [DEBUG] Key fields after sanitization:")
-    logger.info(f"  - title: {idea.get('title')}")
-    logger.info(f"  - hook: {idea.get('hook')}")
-    logger.info(f"  - score: {idea.get('score')}")
-    logger.info(f"  - mvp_effort: {idea.get('mvp_effort')}")
-    logger.info(f"  - scope_commitment: {idea.get('scope_commitment')}")
-    logger.info(f"  - source_of_inspiration: {idea.get('source_of_inspiration')}")
-    logger.info(f"  - problem_statement: {idea.get('problem_statement')}")
-    logger.info(f"  - elevator_pitch: {idea.get('elevator_pitch')}")
-    logger.info(f"  - core_assumptions: {idea.get('core_assumptions')}")
-    logger.info(f"  - riskiest_assumptions: {idea.get('riskiest_assumptions')}")
-    logger.info(f"  - generation_notes: {idea.get('generation_notes')}")
+    # Debug logging of final sanitized idea; skipped entirely unless DEBUG is on
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("🔍 sanitize_idea_fields result keys: %s", list(idea.keys()))
+        logger.debug(
+            "🔍 Key fields after sanitization: %r",
+            {field: idea.get(field) for field in _IDEA_DEBUG_FIELDS}
+        )
     
-    # When calling split, check type first
-    if "hook" in idea and isinstance(idea["hook"], str):
-        idea["hook"] = idea["hook"].split("\n")[0] if "\n" in idea["hook"] else idea["hook"]
-    if "value" in idea and isinstance(idea["value"], str):
-        idea["value"] = idea["value"].split("\n")[0] if "\n" in idea["value"] else idea["value"]
+    # Keep only the first line; partition copies just that prefix, and returns
+    # the string unchanged when it has no newline
+    for field in ("hook", "value"):
+        text = get(field)
+        if isinstance(text, str):
+            idea[field] = text.partition("\n")[0]
     
     return idea
 
@@ -307,14 +581,14 @@ def parse_idea_response(response: Optional[str]) -> List[Dict[str, Any]]:
     if isinstance(ideas, list) and ideas:
         for idea in ideas:
             if not isinstance(idea, dict):
-                logger.warning(f"Skipping non-dict idea: {idea}")
+                logger.warning("Skipping non-dict idea: %s", idea)
                 continue
             idea = sanitize_idea_fields(idea)
             idea = filter_idea_fields(idea)  # Remove unexpected fields
             parsed.append(idea)
         return parsed
     # Fallback: split by '**Idea' or numbered headings
-    sections = re.split(r'\*\*Idea \d+|^Idea \d+|^\d+\. ', response, flags=re.MULTILINE)
+    sections = _IDEA_SPLIT_RE.split(response)
     for section in sections:
         idea = parse_single_idea(section)
         if idea:
@@ -322,6 +596,35 @@ def parse_idea_response(response: Optional[str]) -> List[Dict[str, Any]]:
             parsed.append(idea)
     return parsed
 
+async def aparse_idea_response(response: Optional[str]) -> List[Dict[str, Any]]:
+    """Parse an idea response in a worker thread, so a long parse does not stall the event loop."""
+    # Parsing is pure Python and holds the GIL, so splitting sections across threads
+    # would not run them in parallel; one thread keeps the loop serving other requests
+    return await asyncio.to_thread(parse_idea_response, response)
+
+# Starting values of an idea parsed by parse_single_idea, copied per section
+_IDEA_SECTION_DEFAULTS = MappingProxyType({
+    "title": "",
+    "hook": "",
+    "value": "",
+    "evidence": "",
+    "differentiator": "",
+    "score": 5,
+    "mvp_effort": 5,
+    "type": None,
+    "assumptions": None,  # Replaced by a new list per idea
+    "evidence_reference": None,  # Replaced by a new dict per idea
+    "repo_usage": ""
+})
+
+# Field names that mark a parse_single_idea header when they start a line
+_IDEA_FIELD_PREFIXES = ('hook', 'value', 'evidence', 'differentiator')
+# Lines skipped when looking for an idea's title: field headers (lowercased, then as
+# the LLM usually writes them) and list items
+_IDEA_HEADER_PREFIXES = ('hook:', 'value:', 'evidence:', 'differentiator:', 'score:', 'mvp')
+_IDEA_HEADER_PREFIXES_CASED = ('Hook:', 'Value:', 'Evidence:', 'Differentiator:', 'Score:', 'MVP')
+_LIST_ITEM_PREFIXES = ('•', '-', '*', '1.', '2.', '3.')
+
 def parse_single_idea(section: Optional[str]) -> Optional[Dict[str, Any]]:
     """Parse a single idea section"""
     if not section:
@@ -329,23 +632,14 @@ def parse_single_idea(section: Optional[str]) -> Optional[Dict[str, Any]]:
     section = section.strip()
     if not section:
         return None
-    idea: Dict[str, Any] = {
-        "title": "",
-        "hook": "",
-        "value": "",
-        "evidence": "",
-        "differentiator": "",
-        "score": 5,
-        "mvp_effort": 5,
-        "type": None,
-        "assumptions": [],
-        "evidence_reference": {},
-        "repo_usage": ""
-    }
+    idea: Dict[str, Any] = _IDEA_SECTION_DEFAULTS.copy()
+    # Fresh containers, so parsed ideas never share them through the template
+    idea["assumptions"] = []
+    idea["evidence_reference"] = {}
     
     # Try to extract JSON if present
     try:
-        parsed_json = json.loads(section)
+        parsed_json = _json_loads(section)
         if isinstance(parsed_json, dict):
             # Validate that we have at least a title or hook
             if parsed_json.get("title") or parsed_json.get("hook"):
@@ -365,11 +659,11 @@ def parse_single_idea(section: Optional[str]) -> Optional[Dict[str, Any]]:
                 continue
             
             # Skip common headers
-            if line.lower().startswith(('hook:', 'value:', 'evidence:', 'differentiator:', 'score:', 'mvp')):
+            if line.lower().startswith(_IDEA_HEADER_PREFIXES):
                 continue
             
             # If this line looks like a title (not too long, doesn't start with common words)
-            if len(line) > 3 and len(line) < 100 and not line.startswith(('•', '-', '*', '1.', '2.', '3.')):
+            if len(line) > 3 and len(line) < 100 and not line.startswith(_LIST_ITEM_PREFIXES):
                 idea["title"] = line
                 break
     
@@ -377,7 +671,7 @@ def parse_single_idea(section: Optional[str]) -> Optional[Dict[str, Any]]:
     if not idea["title"]:
         for line in lines:
             line = line.strip()
-            if line and not line.startswith(('Hook:', 'Value:', 'Evidence:', 'Differentiator:', 'Score:', 'MVP')):
+            if line and not line.startswith(_IDEA_HEADER_PREFIXES_CASED):
                 if len(line) > 10 and len(line) < 150:  # Reasonable title length
                     idea["title"] = line
                     break
@@ -394,48 +688,43 @@ def parse_single_idea(section: Optional[str]) -> Optional[Dict[str, Any]]:
         # Check for field headers with more flexible matching
         line_lower = line.lower()
         
-        if line_lower.startswith('hook') or 'hook:' in line_lower:
-            if current_field and current_content:
-                idea[current_field] = '\n'.join(current_content).strip()
-            current_field = 'hook'
-            current_content = []
+        # Every header test below needs a ':' or a "10" somewhere in the line, or one of
+        # the field names at its start, so most content lines are settled by three scans
+        if ':' not in line_lower and '10' not in line_lower and not line_lower.startswith(_IDEA_FIELD_PREFIXES):
+            field = None
+        elif line_lower.startswith('hook') or 'hook:' in line_lower:
+            field = 'hook'
         elif line_lower.startswith('value') or 'value:' in line_lower:
-            if current_field and current_content:
-                idea[current_field] = '\n'.join(current_content).strip()
-            current_field = 'value'
-            current_content = []
+            field = 'value'
         elif line_lower.startswith('evidence') or 'evidence:' in line_lower:
-            if current_field and current_content:
-                idea[current_field] = '\n'.join(current_content).strip()
-            current_field = 'evidence'
-            current_content = []
+            field = 'evidence'
         elif line_lower.startswith('differentiator') or 'differentiator:' in line_lower:
-            if current_field and current_content:
-                idea[current_field] = '\n'.join(current_content).strip()
-            current_field = 'differentiator'
-            current_content = []
+            field = 'differentiator'
         elif 'score' in line_lower and ('/10' in line or 'out of 10' in line_lower):
-            if current_field and current_content:
-                idea[current_field] = '\n'.join(current_content).strip()
-            # Extract score
-            score_match = re.search(r'(\d+)/10', line)
-            if score_match:
-                idea["score"] = int(score_match.group(1))
-            current_field = None
-            current_content = []
+            field = 'score'
         elif ('mvp' in line_lower or 'complexity' in line_lower) and ('/10' in line or 'out of 10' in line_lower):
-            if current_field and current_content:
-                idea[current_field] = '\n'.join(current_content).strip()
-            # Extract MVP effort
-            effort_match = re.search(r'(\d+)/10', line)
-            if effort_match:
-                idea["mvp_effort"] = int(effort_match.group(1))
-            current_field = None
-            current_content = []
+            field = 'mvp_effort'
         else:
+            field = None
+        
+        if field is None:
             # Content for current field
             if current_field:
                 current_content.append(line)
+            continue
+        
+        # A header ends the previous field
+        if current_field and current_content:
+            idea[current_field] = '\n'.join(current_content).strip()
+        current_content = []
+        if field in ("score", "mvp_effort"):
+            # Extract the score or MVP effort
+            score_match = _SCORE_RE.search(line)
+            if score_match:
+                idea[field] = int(score_match.group(1))
+            current_field = None
+        else:
+            current_field = field
     
     # Save last field content
     if current_field and current_content:
@@ -445,18 +734,18 @@ def parse_single_idea(section: Optional[str]) -> Optional[Dict[str, Any]]:
     if not idea["title"]:
         if idea["hook"]:
             # Use first sentence of hook as title
-            hook_sentences = idea["hook"].split('.')
-            if hook_sentences[0]:
-                idea["title"] = hook_sentences[0].strip()
+            first_sentence = idea["hook"].partition('.')[0]
+            if first_sentence:
+                idea["title"] = first_sentence.strip()
         elif idea["value"]:
             # Use first sentence of value as title
-            value_sentences = idea["value"].split('.')
-            if value_sentences[0]:
-                idea["title"] = value_sentences[0].strip()
+            first_sentence = idea["value"].partition('.')[0]
+            if first_sentence:
+                idea["title"] = first_sentence.strip()
     
     # Validate that we have at least a title
     if not idea["title"]:
-        logger.warning(f"Could not extract title from idea section: {section[:200]}...")
+        logger.warning("Could not extract title from idea section: %.200s...", section)
         return None
     
     # Use the sanitizer for all fields
@@ -468,17 +757,31 @@ def robust_extract_json(response: str) -> Optional[Dict]:
     """
     Extracts and validates JSON from a string, attempting repairs if necessary.
     """
-    logging.info("[ROBUST JSON] Starting robust JSON extraction...")
-    logging.info(f"[ROBUST JSON] Raw response: {response}")  # Log raw response
+    # A bare object (the common case) skips the fence, delimiter and brace scans
+    stripped = response.strip()
+    if stripped.startswith('{'):
+        try:
+            data = orjson.loads(stripped)
+        except orjson.JSONDecodeError:
+            data = None
+        if isinstance(data, dict):
+            return data
 
     extracted_json = extract_json_from_llm_response(response)
-    logging.info(f"[ROBUST JSON] Extracted JSON: {extracted_json}")  # Log extracted JSON
 
+    # Well-formed output is returned without the repair passes
+    try:
+        data = orjson.loads(extracted_json)
+    except orjson.JSONDecodeError:
+        data = None
+    if isinstance(data, dict):
+        return data
+
+    logger.debug("[ROBUST JSON] Direct parse failed, repairing %d chars", len(extracted_json))
     repaired_json = repair_json_with_py(extracted_json)
-    logging.info(f"[ROBUST JSON] Repaired JSON: {repaired_json}")  # Log repaired JSON
 
     data = layered_json_fix_and_validate(repaired_json)
-    logging.info(f"[ROBUST JSON] Data after layered fix: {data}")  # Log final data
+    logger.debug("[ROBUST JSON] Data after layered fix: %s", data)
 
     return data
 
@@ -509,17 +812,22 @@ def sanitize_deep_dive_fields(deep_dive: Dict[str, Any]) -> Dict[str, Any]:
                 deep_dive[field] = None
     return deep_dive
 
+def _normalize_score_key(key: str) -> str:
+    return key.lower().replace('-', ' ').replace('_', ' ').strip()
+
 def convert_old_deep_dive_format(old_data: Dict[str, Any]) -> DeepDiveIdeaData:
     """Convert old deep dive format to new structured format"""
     try:
         # Extract scores from the old format
         signal_scores = old_data.get('Signal Score', {})
-        # Normalize keys for robustness
+        # Normalize keys for robustness; the index is built once, and the first
+        # key with a given normalized form wins, as in a scan in key order
+        scores_by_key: Dict[str, Any] = {}
+        for k, v in signal_scores.items():
+            scores_by_key.setdefault(_normalize_score_key(k), v)
         def get_score(key):
-            for k in signal_scores.keys():
-                if k.lower().replace('-', ' ').replace('_', ' ').strip() == key.lower().replace('-', ' ').replace('_', ' ').strip():
-                    return float(signal_scores.get(k, 0))
-            return 0.0
+            normalized = _normalize_score_key(key)
+            return float(scores_by_key[normalized]) if normalized in scores_by_key else 0.0
         # Map new scores
         market_opportunity_scores: Dict[str, Optional[float]] = {
             'product_market_fit': get_score('Product-Market Fit Potential'),
@@ -591,18 +899,21 @@ def convert_old_deep_dive_format(old_data: Dict[str, Any]) -> DeepDiveIdeaData:
         return DeepDiveIdeaData(raw_llm_fields=old_data)
 
 def robust_parse_deep_dive_raw_response(raw_response: str) -> DeepDiveIdeaData:
-    import re, json
     from app.types import DeepDiveIdeaData
     if not raw_response:
         return DeepDiveIdeaData()
     # Remove triple backticks and whitespace
-    cleaned = re.sub(r'^```json|```$', '', raw_response.strip(), flags=re.MULTILINE).strip()
-    # Find the first JSON object in the string
-    match = re.search(r'(\{[\s\S]*?\})', cleaned)
-    if match:
-        json_str = match.group(1)
+    cleaned = raw_response.strip()
+    if cleaned.startswith('```'):
+        cleaned = cleaned[7:] if cleaned.startswith('```json') else cleaned[3:]
+    cleaned = cleaned.removesuffix('```').strip()
+    # Find the first JSON object in the string, nested objects included
+    start = cleaned.find('{')
+    if start != -1:
+        # An unclosed (truncated) object is still attempted, for the parse error
+        json_str = _find_balanced(cleaned, start) or cleaned[start:]
         try:
-            data = json.loads(json_str)
+            data = _json_loads(json_str)
             deep_dive = convert_old_deep_dive_format(data)
             deep_dive.raw_llm_fields = data
             return deep_dive
@@ -625,7 +936,7 @@ def parse_deep_dive_response(response: str) -> DeepDiveIdeaData:
 
 def parse_iterating_response(response: str) -> IteratingIdeaData:
     try:
-        data = json.loads(response)
+        data = _json_loads(response)
         if 'iteratingTable' not in data or not isinstance(data['iteratingTable'], list):
             raise ValueError('Missing or invalid iteratingTable')
         return IteratingIdeaData(**data)
@@ -635,7 +946,7 @@ def parse_iterating_response(response: str) -> IteratingIdeaData:
 
 def parse_considering_response(response: str) -> ConsideringIdeaData:
     try:
-        data = json.loads(response)
+        data = _json_loads(response)
         if 'consideringTable' not in data or not isinstance(data['consideringTable'], list):
             raise ValueError('Missing or invalid consideringTable')
         return ConsideringIdeaData(**data)
@@ -647,14 +958,6 @@ def parse_by_headers(text: str) -> List[Dict[str, Any]]:
     """Parse text by looking for markdown headers or section titles."""
     sections = []
     
-    # Common section headers to look for
-    header_patterns = [
-        r'^#+\s*(.+)$',  # Markdown headers
-        r'^([A-Z][A-Za-z\s]+):\s*$',  # Title: format
-        r'^([A-Z][A-Za-z\s]+)\s*[-–—]\s*$',  # Title - format
-        r'^(\d+\.\s*[A-Z][A-Za-z\s]+)',  # 1. Title format
-    ]
-    
     lines = text.split('\n')
     current_section = None
     current_content = []
@@ -665,17 +968,10 @@ def parse_by_headers(text: str) -> List[Dict[str, Any]]:
             continue
             
         # Check if this line is a header
-        is_header = False
-        header_title = None
-        
-        for pattern in header_patterns:
-            match = re.match(pattern, line, re.IGNORECASE)
-            if match:
-                is_header = True
-                header_title = match.group(1).strip()
-                break
+        match = _HEADER_RE.match(line)
         
-        if is_header:
+        if match:
+            header_title = match.group(match.lastindex).strip()
             # Save previous section
             if current_section and current_content:
                 sections.append({
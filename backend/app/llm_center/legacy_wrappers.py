@@ -6,11 +6,14 @@ These functions wrap the centralized LLM service to maintain the same interface.
 """
 
 import asyncio
+import logging
+import os
 from typing import Dict, Any, List, Optional
 from app.llm_center import LLMCenter, PromptType, ProcessingContext
 from app.llm_center.parsers import ResponseParser
 from app.types import DeepDiveIdeaData, IteratingIdeaData, ConsideringIdeaData
 
+logger = logging.getLogger(__name__)
 
 # Initialize the LLM center
 _llm_center = None
@@ -24,16 +27,33 @@ def get_llm_center():
     return _llm_center
 
 
+# Upper bound on concurrent call_groq requests, so fan-outs stay within Groq rate limits
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+_llm_semaphore: Optional[asyncio.Semaphore] = None
+_llm_semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _get_llm_semaphore() -> asyncio.Semaphore:
+    """Get the call_groq semaphore for the running event loop"""
+    global _llm_semaphore, _llm_semaphore_loop
+    loop = asyncio.get_running_loop()
+    if _llm_semaphore_loop is not loop:
+        _llm_semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+        _llm_semaphore_loop = loop
+    return _llm_semaphore
+
+
 async def call_groq(prompt: str, model: str = "moonshotai/kimi-k2-instruct") -> str:
     """
     Legacy wrapper for call_groq function
     """
     llm_center = get_llm_center()
-    response = await llm_center.call_llm(
-        prompt_type=PromptType.GENERAL_LLM,
-        content=prompt,
-        model=model
-    )
+    async with _get_llm_semaphore():
+        response = await llm_center.call_llm(
+            prompt_type=PromptType.GENERAL_LLM,
+            content=prompt,
+            model=model
+        )
     return response.content
 
 
@@ -245,6 +265,33 @@ async def generate_investor_deck(*args, **kwargs):
     return await call_groq(prompt)
 
 
+async def generate_full_analysis(context: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run every advanced-feature generation for one context concurrently
+    
+    The generations are independent LLM calls, so the total wait is the
+    slowest call rather than their sum. A generation that fails is logged and
+    returned as None, without failing the others.
+    """
+    names = ("case_study", "market_snapshot", "lens_insight", "vc_thesis_comparison", "investor_deck")
+    results = await asyncio.gather(
+        generate_case_study(context),
+        generate_market_snapshot(context),
+        generate_lens_insight(context),
+        generate_vc_thesis_comparison(context),
+        generate_investor_deck(context),
+        return_exceptions=True
+    )
+    
+    analysis = {}
+    for name, result in zip(names, results):
+        if isinstance(result, Exception):
+            logger.error("Failed to generate %s: %s", name, result)
+            result = None
+        analysis[name] = result
+    return analysis
+
+
 async def generate_iteration_experiment(*args, **kwargs):
     """Generate iteration experiment using DSPy"""
     prompt = "Generate iteration experiment based on the provided parameters"
@@ -5,6 +5,8 @@ import re
 import logging
 from typing import Dict, Any, List, Optional, Union
 
+import orjson
+
 from ..types.llm_types import LLMResponse, ParsedResponse, PromptType
 from ..types.schemas import DeepDiveIdeaData, IteratingIdeaData, ConsideringIdeaData, DeepDiveCategoryData
 from ..utils.json_repair_util import repair_json_with_py, extract_json_from_llm_response
@@ -13,6 +15,20 @@ from ..utils.json_repair_util import repair_json_with_py, extract_json_from_llm_
 logger = logging.getLogger(__name__)
 
 
+def _json_loads(text: Union[str, bytes]) -> Any:
+    """Parse JSON with orjson, falling back to the stdlib for what it rejects (NaN, huge ints)"""
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        return json.loads(text)
+
+# Patterns used by the response parsers, compiled once at import
+_IDEA_SPLIT_RE = re.compile(r'\*\*Idea \d+|^Idea \d+|^\d+\. ', re.MULTILINE)
+_JSON_ARRAY_RE = re.compile(r'\[\s*{.*?}\s*\]', re.DOTALL)
+_FENCE_RE = re.compile(r'^```json|```$', re.MULTILINE)
+_JSON_OBJ_RE = re.compile(r'(\{[\s\S]*?\})')
+
+
 class ResponseParser:
     """Central response parser for all LLM outputs"""
     
@@ -64,7 +80,7 @@ class ResponseParser:
             return {"ideas": parsed_ideas}
         
         # Fallback: parse by sections
-        sections = re.split(r'\*\*Idea \d+|^Idea \d+|^\d+\. ', content, flags=re.MULTILINE)
+        sections = _IDEA_SPLIT_RE.split(content)
         for section in sections:
             idea = self._parse_single_idea(section)
             if idea:
@@ -80,7 +96,7 @@ class ResponseParser:
     def _parse_iterating(self, content: str) -> Dict[str, Any]:
         """Parse iterating response"""
         try:
-            data = json.loads(content)
+            data = _json_loads(content)
             if 'iteratingTable' not in data or not isinstance(data['iteratingTable'], list):
                 raise ValueError('Missing or invalid iteratingTable')
             return data
@@ -91,7 +107,7 @@ class ResponseParser:
     def _parse_considering(self, content: str) -> Dict[str, Any]:
         """Parse considering response"""
         try:
-            data = json.loads(content)
+            data = _json_loads(content)
             if 'consideringTable' not in data or not isinstance(data['consideringTable'], list):
                 raise ValueError('Missing or invalid consideringTable')
             return data
@@ -101,17 +117,17 @@ class ResponseParser:
     
     def _extract_json_array(self, text: str) -> Optional[List[Dict]]:
         """Extract JSON array from text"""
-        match = re.search(r'\[\s*{.*?}\s*\]', text, re.DOTALL)
+        match = _JSON_ARRAY_RE.search(text)
         if match:
             try:
-                return json.loads(match.group(0))
+                return _json_loads(match.group(0))
             except Exception as e:
                 logger.error(f'JSON parse error: {e}')
                 return None
         
         # Fallback: try to parse the whole text
         try:
-            return json.loads(text)
+            return _json_loads(text)
         except Exception as e:
             logger.error(f'JSON parse error: {e}')
             return None
@@ -228,14 +244,14 @@ class ResponseParser:
             return DeepDiveIdeaData()
         
         # Remove triple backticks and whitespace
-        cleaned = re.sub(r'^```json|```$', '', raw_response.strip(), flags=re.MULTILINE).strip()
+        cleaned = _FENCE_RE.sub('', raw_response.strip()).strip()
         
         # Find the first JSON object
-        match = re.search(r'(\{[\s\S]*?\})', cleaned)
+        match = _JSON_OBJ_RE.search(cleaned)
         if match:
             json_str = match.group(1)
             try:
-                data = json.loads(json_str)
+                data = _json_loads(json_str)
                 deep_dive = self._convert_old_deep_dive_format(data)
                 deep_dive.raw_llm_fields = data
                 return deep_dive
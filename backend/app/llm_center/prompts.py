@@ -1,11 +1,33 @@
 """Prompt management and template handling"""
 
 import os
+from functools import lru_cache
 from typing import Dict, Any, Optional
 from jinja2 import Template, Environment, FileSystemLoader
 from ..types.llm_types import PromptType, ProcessingContext
 
 
+# Template file rendered for each prompt type
+_TEMPLATE_NAMES = {
+    PromptType.IDEA_GENERATION: "idea_generation.j2",
+    PromptType.DEEP_DIVE: "deep_dive.j2",
+    PromptType.ITERATING: "iterating.j2",
+    PromptType.CONSIDERING: "considering.j2",
+    PromptType.BUILDING: "building.j2",
+    PromptType.CLOSED: "closed.j2",
+    PromptType.RESUME_PROCESSING: "resume_processing.j2",
+    PromptType.PITCH_GENERATION: "pitch_generation.j2",
+    PromptType.PERSONALIZED_IDEAS: "personalized_ideas.j2",
+    PromptType.GENERAL_LLM: "general.j2"
+}
+
+
+@lru_cache(maxsize=256)
+def _compile_inline_template(template_str: str) -> Template:
+    """Compile an inline template once; callers reuse the same few template strings"""
+    return Template(template_str)
+
+
 class PromptManager:
     """Central prompt management system"""
     
@@ -59,20 +81,7 @@ class PromptManager:
     
     def _get_template_name(self, prompt_type: PromptType) -> str:
         """Map prompt type to template file name"""
-        template_mapping = {
-            PromptType.IDEA_GENERATION: "idea_generation.j2",
-            PromptType.DEEP_DIVE: "deep_dive.j2", 
-            PromptType.ITERATING: "iterating.j2",
-            PromptType.CONSIDERING: "considering.j2",
-            PromptType.BUILDING: "building.j2",
-            PromptType.CLOSED: "closed.j2",
-            PromptType.RESUME_PROCESSING: "resume_processing.j2",
-            PromptType.PITCH_GENERATION: "pitch_generation.j2",
-            PromptType.PERSONALIZED_IDEAS: "personalized_ideas.j2",
-            PromptType.GENERAL_LLM: "general.j2"
-        }
-        
-        return template_mapping.get(prompt_type, "general.j2")
+        return _TEMPLATE_NAMES.get(prompt_type, "general.j2")
     
     def _load_template(self, template_name: str) -> Template:
         """Load and cache a template"""
@@ -96,7 +105,7 @@ class PromptManager:
         Returns:
             Rendered prompt string
         """
-        template = Template(template_str)
+        template = _compile_inline_template(template_str)
         return template.render(**kwargs)
 
 
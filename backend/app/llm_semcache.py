@@ -0,0 +1,87 @@
+"""
+Semantic cache for Groq responses.
+
+Prompts are embedded with a local sentence-transformers model and kept in one
+HNSW index per model. A prompt whose nearest cached prompt has a cosine
+similarity of at least GROQ_SEMANTIC_CACHE_THRESHOLD reuses that prompt's
+response, so rewordings of a request skip the API call the exact-match cache
+in app.llm would miss.
+
+Enabled with GROQ_SEMANTIC_CACHE=1 when sentence-transformers and hnswlib are
+installed; otherwise call_groq only uses the exact-match cache.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import hnswlib
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    hnswlib = None
+    SentenceTransformer = None
+
+logger = logging.getLogger(__name__)
+
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("GROQ_SEMANTIC_CACHE_THRESHOLD", "0.92"))
+SEMANTIC_CACHE_MODEL = os.getenv("GROQ_SEMANTIC_CACHE_MODEL", "all-MiniLM-L6-v2")
+SEMANTIC_CACHE_MAX_ELEMENTS = int(os.getenv("GROQ_SEMANTIC_CACHE_MAX_ELEMENTS", "50000"))
+
+
+class SemanticCache:
+    """Nearest-neighbour cache of responses, keyed by prompt embedding"""
+
+    def __init__(
+        self,
+        model_name: str = SEMANTIC_CACHE_MODEL,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        max_elements: int = SEMANTIC_CACHE_MAX_ELEMENTS
+    ):
+        self.enabled = os.getenv("GROQ_SEMANTIC_CACHE", "0") == "1" and hnswlib is not None
+        self.model_name = model_name
+        self.threshold = threshold
+        self.max_elements = max_elements
+        self._encoder = None
+        # LLM model -> (index, responses by index label)
+        self._indexes: Dict[str, Tuple[Any, List[str]]] = {}
+
+    def _embed(self, prompt: str) -> Any:
+        if self._encoder is None:
+            self._encoder = SentenceTransformer(self.model_name)
+        return self._encoder.encode(prompt, normalize_embeddings=True)
+
+    async def lookup(self, prompt: str, model: str) -> Tuple[Optional[str], Any]:
+        """Return (cached response or None, prompt embedding)
+
+        The embedding is returned so a miss can be stored without re-encoding.
+        """
+        # Encoding is CPU-bound, so it runs off the event loop
+        embedding = await asyncio.to_thread(self._embed, prompt)
+        entry = self._indexes.get(model)
+        if entry is None:
+            return None, embedding
+        index, responses = entry
+        if index.get_current_count() == 0:
+            return None, embedding
+        labels, distances = index.knn_query(embedding, k=1)
+        if 1 - distances[0][0] < self.threshold:
+            return None, embedding
+        return responses[labels[0][0]], embedding
+
+    def store(self, model: str, embedding: Any, content: str) -> None:
+        """Cache content as the response to the prompt embedded as embedding"""
+        entry = self._indexes.get(model)
+        if entry is None:
+            index = hnswlib.Index(space="cosine", dim=len(embedding))
+            index.init_index(max_elements=self.max_elements)
+            entry = self._indexes[model] = (index, [])
+        index, responses = entry
+        if len(responses) >= self.max_elements:
+            return
+        index.add_items(embedding, len(responses))
+        responses.append(content)
+
+
+semantic_cache = SemanticCache()
@@ -740,11 +740,22 @@ class LLMInputLog(Base):
     __tablename__ = 'llm_input_log'
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(String, index=True)
+    session_id = Column(String, index=True)  # Groups the calls made for one request
     stage = Column(String, index=True)
     reason = Column(String)
+    input_text = Column(Text)  # The prompt input sent to the model
+    input_type = Column(String)
+    model_name = Column(String)
+    parameters = Column(Text)  # JSON as text
     context_json = Column(Text)  # JSON as text
     raw_output = Column(String)  # Store as string for linter compatibility
     cleaned_output = Column(String)  # Store as string for linter compatibility
+    # Outcome of the call; a processing log row is only added when it failed
+    output_text = Column(Text)
+    status = Column(String)
+    processing_time_ms = Column(Integer)
+    tokens_used = Column(Integer)
+    cost = Column(Float)
     created_at = Column(DateTime, default=datetime.utcnow)
     processing_logs = relationship('LLMProcessingLog', back_populates='input_log')
 
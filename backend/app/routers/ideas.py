@@ -14,6 +14,7 @@ from app.services.event_bus import EventBus
 import logging
 import os
 import json
+import orjson
 from app.tiers import get_tier_config, get_account_type_config
 import asyncio
 import traceback
@@ -476,8 +477,12 @@ async def generate_ideas(
                 'custom_context': request.context,
             }
         )
-        # --- Log the full LLM payload for auditing ---
-        logger.info(f"[LLM PAYLOAD] Full context sent to LLM for idea generation: {json.dumps(context, indent=2, default=str)[:4000]}")
+        # --- Log the LLM payload for auditing, serialized only when it will be emitted ---
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[LLM PAYLOAD] Full context sent to LLM for idea generation: %s", json.dumps(context, indent=2, default=str))
+        elif logger.isEnabledFor(logging.INFO):
+            payload = orjson.dumps(context, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+            logger.info("[LLM PAYLOAD] Context sent to LLM for idea generation: %.500s", payload)
         
         # Handle BYOI (Bring Your Own Idea) flow
         if request.flow_type == 'byoi' or user_idea_data:
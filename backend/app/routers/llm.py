@@ -1,6 +1,10 @@
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request
 from app.llm_center import LLMCenter, PromptType, ProcessingContext
+from app.ai import get_dummy_lm_log
+from app.auth import get_current_active_user
+from app.models import User
 import logging
+import os
 
 router = APIRouter()
 
@@ -25,4 +29,11 @@ async def llm_endpoint(request: Request):
         return {"result": response.content}
     except Exception as e:
         logging.error(f"[LLM API] Error: {e}")
-        raise HTTPException(status_code=500, detail=f"LLM call failed: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"LLM call failed: {str(e)}")
+
+# The DummyLM log holds raw prompts, user context included, so it is only served when enabled
+if os.getenv("AI_DEBUG_ENDPOINTS") == "1":
+    @router.get("/debug/dummy_lm_log")
+    async def dummy_lm_log(limit: int = 100, current_user: User = Depends(get_current_active_user)):
+        """Recent requests seen by the development DummyLM"""
+        return {"entries": get_dummy_lm_log(limit)}
\ No newline at end of file
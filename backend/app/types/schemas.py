@@ -831,6 +831,10 @@ class DeepDiveBase(BaseModel):
 class DeepDiveCreate(DeepDiveBase):
     pass
 
+class DeepDiveVersionCreate(BaseModel):
+    version_number: int = 1
+    fields: Dict[str, Any] = {}
+
 class DeepDiveOut(DeepDiveBase):
     id: str
     created_at: datetime
@@ -35,7 +35,7 @@ def extract_json_from_llm_response(response: str) -> str:
     delimiters = ['---', '###', '===']
     for delimiter in delimiters:
         if delimiter in response:
-            response = response.split(delimiter)[0].strip()
+            response = response.partition(delimiter)[0].strip()
     
     # Find the first '{' and try to find the matching closing '}'
     start = response.find('{')
@@ -16,6 +16,10 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from fastapi import Request, Response
 from app.models import User
 from app.lifecycle_map import router as lifecycle_map_router
+from app.ai import start_llm_http_client, close_llm_http_client
+from app.ai.artifact_writer import artifact_writer
+from app.ai.log_writer import log_writer
+from app.llm import close_groq_client
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -92,6 +96,21 @@ def ensure_tables_exist_and_seed():
     # else:
     #     logger.info("No users found. Skipping system idea seeding.")
 
+@app.on_event("startup")
+async def start_llm_log_writer():
+    log_writer.start()
+    artifact_writer.start()
+    # Created here, not at import, so the client belongs to the serving event loop
+    await start_llm_http_client()
+
+@app.on_event("shutdown")
+async def drain_llm_log_writer():
+    # Flush queued LLM logs before the process exits
+    await log_writer.stop()
+    await artifact_writer.stop()
+    await close_llm_http_client()
+    await close_groq_client()
+
 class DBReadyMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
         if not db_ready and request.url.path not in ["/health", "/db-ready"]:
@@ -0,0 +1,4 @@
+import os
+
+# Point the app at an in-memory database before any app module is imported
+os.environ.setdefault("DATABASE_URL", "sqlite://")
@@ -0,0 +1,220 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.ai import cache
+from app.ai.cache import LLMResponseCache, memoize_stage
+
+
+class FakeRedis:
+    """In-memory stand-in for the redis.asyncio commands the caches use"""
+
+    def __init__(self):
+        self.values = {}
+        self.hashes = {}
+        self.sorted_sets = {}
+
+    async def get(self, name):
+        return self.values.get(name)
+
+    async def setex(self, name, ttl, value):
+        self.values[name] = as_bytes(value)
+
+    async def expire(self, name, ttl):
+        pass
+
+    async def hset(self, name, key, value):
+        self.hashes.setdefault(name, {})[key.encode("utf-8")] = value
+
+    async def hmget(self, name, keys):
+        entries = self.hashes.get(name, {})
+        return [entries.get(key) for key in keys]
+
+    async def hdel(self, name, *keys):
+        for key in keys:
+            self.hashes.get(name, {}).pop(as_bytes(key), None)
+
+    async def zadd(self, name, mapping):
+        self.sorted_sets.setdefault(name, {}).update({as_bytes(key): score for key, score in mapping.items()})
+
+    async def zrem(self, name, *keys):
+        for key in keys:
+            self.sorted_sets.get(name, {}).pop(as_bytes(key), None)
+
+    async def zcard(self, name):
+        return len(self.sorted_sets.get(name, {}))
+
+    async def zcount(self, name, low, high):
+        return len(await self.zrangebyscore(name, low, high))
+
+    async def zrange(self, name, start, end):
+        return self.ordered(name)[start:end + 1]
+
+    async def zrangebyscore(self, name, low, high):
+        entries = self.sorted_sets.get(name, {})
+        return [key for key in self.ordered(name) if float(low) <= entries[key] <= float(high)]
+
+    def ordered(self, name):
+        entries = self.sorted_sets.get(name, {})
+        return sorted(entries, key=entries.get)
+
+def as_bytes(key):
+    return key if isinstance(key, bytes) else key.encode("utf-8")
+
+def backdate(response_cache, key, seconds):
+    stored_at, output = response_cache._local[key]
+    response_cache._local[key] = (stored_at - seconds, output)
+
+def make_idea(idea_id=1):
+    return SimpleNamespace(id=idea_id, title="Idea", description="An idea", updated_at=None)
+
+class SlowStage:
+    def __init__(self):
+        self.calls = 0
+
+    def get_stage_name(self):
+        return "deep_dive"
+
+    @memoize_stage()
+    async def process_stage(self, idea, user, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return {"success": True, "idea_id": idea.id}
+
+def semantic_cache(monkeypatch, **kwargs):
+    np = pytest.importorskip("numpy")
+    monkeypatch.setattr(cache, "np", np)
+    monkeypatch.setattr(cache, "SentenceTransformer", object)
+    response_cache = LLMResponseCache(client=FakeRedis(), **kwargs)
+    vectors = {}
+
+    async def embed(text):
+        return vectors[text]
+    response_cache._embed = embed
+
+    def unit(*values):
+        vector = np.array(values, dtype=np.float32)
+        return vector / np.linalg.norm(vector)
+    return response_cache, vectors, unit
+
+
+def test_local_hit_and_miss():
+    response_cache = LLMResponseCache()
+
+    async def run():
+        await response_cache.store("deep_dive", "key-1", "prompt", "output")
+        return await response_cache.lookup("deep_dive", "key-1", "prompt"), await response_cache.lookup("deep_dive", "key-2", "other")
+    hit, miss = asyncio.run(run())
+
+    assert hit == ("output", None)
+    assert miss == (None, None)
+
+def test_local_entry_expires_after_ttl():
+    response_cache = LLMResponseCache(ttl=60)
+    asyncio.run(response_cache.store("deep_dive", "key-1", "prompt", "output"))
+    backdate(response_cache, "key-1", 61)
+
+    assert asyncio.run(response_cache.lookup("deep_dive", "key-1", "prompt")) == (None, None)
+    assert "key-1" not in response_cache._local
+
+def test_local_lru_evicts_least_recently_used():
+    response_cache = LLMResponseCache(local_size=2)
+
+    async def run():
+        await response_cache.store("deep_dive", "key-1", "prompt 1", "output 1")
+        await response_cache.store("deep_dive", "key-2", "prompt 2", "output 2")
+        await response_cache.lookup("deep_dive", "key-1", "prompt 1")
+        await response_cache.store("deep_dive", "key-3", "prompt 3", "output 3")
+    asyncio.run(run())
+
+    assert list(response_cache._local) == ["key-1", "key-3"]
+
+def test_exact_hit_from_redis():
+    client = FakeRedis()
+    asyncio.run(LLMResponseCache(client=client).store("deep_dive", "key-1", "prompt", "output"))
+
+    assert asyncio.run(LLMResponseCache(client=client).lookup("deep_dive", "key-1", "prompt")) == ("output", None)
+
+def test_semantic_hit_reuses_nearest_output(monkeypatch):
+    response_cache, vectors, unit = semantic_cache(monkeypatch, threshold=0.9)
+    vectors.update({"prompt": unit(1, 0, 0), "similar": unit(1, 0.1, 0), "unrelated": unit(0, 1, 0)})
+
+    async def run():
+        await response_cache.store("deep_dive", "key-1", "prompt", "output")
+        response_cache._local.clear()
+        similar, _ = await response_cache.lookup("deep_dive", "key-2", "similar")
+        unrelated, _ = await response_cache.lookup("deep_dive", "key-3", "unrelated")
+        return similar, unrelated
+
+    assert asyncio.run(run()) == ("output", None)
+
+def test_semantic_miss_drops_expired_output(monkeypatch):
+    response_cache, vectors, unit = semantic_cache(monkeypatch, threshold=0.9)
+    vectors.update({"closest": unit(1, 0, 0), "close": unit(1, 0.2, 0), "query": unit(1, 0.05, 0)})
+    client = response_cache.client
+
+    async def run():
+        await response_cache.store("deep_dive", "key-1", "closest", "stale")
+        await response_cache.store("deep_dive", "key-2", "close", "live")
+        response_cache._local.clear()
+        del client.values["ai:llm:key-1"]
+        return await response_cache.lookup("deep_dive", "key-3", "query")
+
+    assert asyncio.run(run())[0] == "live"
+    assert list(client.hashes["ai:llm:emb:deep_dive"]) == [b"key-2"]
+    assert list(client.sorted_sets["ai:llm:emb:deep_dive:stored"]) == [b"key-2"]
+
+def test_semantic_index_is_capped(monkeypatch):
+    response_cache, vectors, unit = semantic_cache(monkeypatch, max_entries=2)
+    vectors.update({f"prompt {i}": unit(1, i, 0) for i in range(3)})
+
+    async def run():
+        for i in range(3):
+            await response_cache.store("deep_dive", f"key-{i}", f"prompt {i}", f"output {i}")
+    asyncio.run(run())
+
+    client = response_cache.client
+    assert sorted(client.hashes["ai:llm:emb:deep_dive"]) == [b"key-1", b"key-2"]
+    assert sorted(client.sorted_sets["ai:llm:emb:deep_dive:stored"]) == [b"key-1", b"key-2"]
+
+def test_concurrent_identical_calls_coalesce(monkeypatch):
+    monkeypatch.setattr(cache, "redis_client", None)
+    stage, idea = SlowStage(), make_idea()
+
+    async def run():
+        return await asyncio.gather(
+            stage.process_stage(idea, SimpleNamespace(id=1)),
+            stage.process_stage(idea, SimpleNamespace(id=2))
+        )
+    first, second = asyncio.run(run())
+
+    assert stage.calls == 1
+    assert first == {"success": True, "idea_id": 1}
+    assert second == {"success": True, "idea_id": 1, "coalesced": True}
+    assert not cache._INFLIGHT
+
+def test_calls_with_different_input_do_not_coalesce(monkeypatch):
+    monkeypatch.setattr(cache, "redis_client", None)
+    stage, user = SlowStage(), SimpleNamespace(id=1)
+
+    async def run():
+        return await asyncio.gather(
+            stage.process_stage(make_idea(1), user),
+            stage.process_stage(make_idea(1), user, focus="market"),
+            stage.process_stage(make_idea(2), user)
+        )
+    results = asyncio.run(run())
+
+    assert stage.calls == 3
+    assert not any(result.get("coalesced") for result in results)
+
+def test_stage_result_is_served_from_redis(monkeypatch):
+    monkeypatch.setattr(cache, "redis_client", FakeRedis())
+    stage, idea, user = SlowStage(), make_idea(), SimpleNamespace(id=1)
+
+    first = asyncio.run(stage.process_stage(idea, user))
+    second = asyncio.run(stage.process_stage(idea, user))
+
+    assert stage.calls == 1
+    assert second == {**first, "cached": True}
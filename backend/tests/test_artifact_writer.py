@@ -0,0 +1,92 @@
+import asyncio
+
+from sqlalchemy import Column, Integer, String, create_engine, select
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.ai.artifact_writer import ArtifactBatchWriter
+
+
+Base = declarative_base()
+
+class Note(Base):
+    __tablename__ = "note"
+    id = Column(Integer, primary_key=True)
+    text = Column(String, nullable=False)
+
+
+def make_engine():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    return engine
+
+def make_writer(engine, **kwargs):
+    return ArtifactBatchWriter(session_factory=sessionmaker(bind=engine), async_session_factory=None, **kwargs)
+
+def saved_texts(engine):
+    with Session(engine) as session:
+        return session.scalars(select(Note.text).order_by(Note.id)).all()
+
+
+def test_save_batches_and_returns_ids():
+    engine = make_engine()
+    writer = make_writer(engine)
+
+    async def run():
+        writer.start()
+        ids = await asyncio.gather(writer.save(Note(text="a")), writer.save(Note(text="b"), Note(text="c")))
+        await writer.stop()
+        return ids
+
+    assert asyncio.run(run()) == [[1], [2, 3]]
+    assert saved_texts(engine) == ["a", "b", "c"]
+
+def test_bad_row_fails_only_its_own_save():
+    engine = make_engine()
+    writer = make_writer(engine)
+
+    async def run():
+        writer.start()
+        results = await asyncio.gather(writer.save(Note(text="ok")), writer.save(Note(text=None)), return_exceptions=True)
+        await writer.stop()
+        return results
+
+    ok, failed = asyncio.run(run())
+    assert ok == [1]
+    assert isinstance(failed, Exception)
+    assert saved_texts(engine) == ["ok"]
+
+def test_cancelled_save_does_not_stop_the_writer():
+    engine = make_engine()
+    writer = make_writer(engine, flush_interval=0.05)
+
+    async def run():
+        writer.start()
+        cancelled = asyncio.ensure_future(writer.save(Note(text="abandoned")))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        later = await asyncio.wait_for(writer.save(Note(text="later")), 1)
+        await writer.stop()
+        return cancelled.cancelled(), later
+
+    assert asyncio.run(run()) == (True, [2])
+    assert saved_texts(engine) == ["abandoned", "later"]
+
+def test_cancelled_save_is_skipped_on_row_by_row_retry():
+    engine = make_engine()
+    writer = make_writer(engine, flush_interval=0.05)
+
+    async def run():
+        writer.start()
+        cancelled = asyncio.ensure_future(writer.save(Note(text="abandoned")))
+        failing = asyncio.ensure_future(writer.save(Note(text=None)))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        results = await asyncio.gather(failing, writer.save(Note(text="later")), return_exceptions=True)
+        await writer.stop()
+        return results
+
+    failed, later = asyncio.run(run())
+    assert isinstance(failed, Exception)
+    assert later == [1]
+    assert saved_texts(engine) == ["later"]
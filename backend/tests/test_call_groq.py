@@ -0,0 +1,55 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app import llm
+
+
+def make_client(responses):
+    """Client answering each request with the next (status, headers) pair"""
+    sent = []
+
+    def handler(request):
+        status, headers = responses[min(len(sent), len(responses) - 1)]
+        sent.append(request)
+        body = {"choices": [{"message": {"content": "answer"}}]} if status == 200 else {}
+        return httpx.Response(status, headers=headers, json=body)
+    return httpx.AsyncClient(base_url="https://api.groq.com", transport=httpx.MockTransport(handler)), sent
+
+@pytest.fixture(autouse=True)
+def fresh_keys(monkeypatch):
+    monkeypatch.setattr(llm, "_key_cooldown", [0.0] * len(llm.GROQ_API_KEYS))
+    monkeypatch.setattr(llm, "_groq_semaphores", {})
+
+
+def test_rate_limits_do_not_use_up_attempts(monkeypatch):
+    limited = (429, {"retry-after": "0"})
+    client, sent = make_client([limited] * (llm.GROQ_MAX_RETRIES + 2) + [(200, {})])
+    monkeypatch.setattr(llm, "_get_groq_client", lambda: client)
+
+    assert asyncio.run(llm.call_groq("rate limited prompt", no_cache=True)) == "answer"
+    assert len(sent) == llm.GROQ_MAX_RETRIES + 3
+
+def test_rate_limited_past_deadline_raises(monkeypatch):
+    client, sent = make_client([(429, {"retry-after": "60"})])
+    monkeypatch.setattr(llm, "_get_groq_client", lambda: client)
+    monkeypatch.setattr(llm, "GROQ_RATE_LIMIT_DEADLINE", 1.0)
+
+    with pytest.raises(llm.GroqRateLimitError):
+        asyncio.run(llm.call_groq("always rate limited prompt", no_cache=True))
+    assert len(sent) == len(llm.GROQ_API_KEYS)
+
+def test_network_errors_use_up_attempts(monkeypatch):
+    sent = []
+
+    def handler(request):
+        sent.append(request)
+        raise httpx.ConnectError("unreachable", request=request)
+    client = httpx.AsyncClient(base_url="https://api.groq.com", transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(llm, "_get_groq_client", lambda: client)
+    monkeypatch.setattr(llm, "GROQ_BACKOFF_CAP", 0.0)
+
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(llm.call_groq("unreachable prompt", no_cache=True))
+    assert len(sent) == llm.GROQ_MAX_RETRIES
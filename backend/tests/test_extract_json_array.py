@@ -0,0 +1,34 @@
+import logging
+
+from app.llm import extract_json_array
+
+
+def test_clean_json_array():
+    assert extract_json_array('[{"title": "A"}, {"title": "B"}]') == [{"title": "A"}, {"title": "B"}]
+
+def test_array_after_prelude():
+    text = 'Here are your ideas:\n```json\n[{"title": "A"}]\n```\nLet me know!'
+
+    assert extract_json_array(text) == [{"title": "A"}]
+
+def test_nested_brackets():
+    text = 'Ideas: [{"title": "A", "tags": ["x", ["y"]], "meta": {"refs": [1, 2]}}]'
+
+    assert extract_json_array(text) == [{"title": "A", "tags": ["x", ["y"]], "meta": {"refs": [1, 2]}}]
+
+def test_brackets_in_surrounding_prose():
+    text = 'Scores are in [0, 10] range.\n[{"title": "A", "score": 7}]\nSee [1] for details.'
+
+    assert extract_json_array(text) == [{"title": "A", "score": 7}]
+
+def test_no_array_returns_none(caplog):
+    with caplog.at_level(logging.DEBUG, logger="app.llm"):
+        assert extract_json_array("Sorry, I cannot help with that.") is None
+
+    assert "No JSON array found" in caplog.text
+
+def test_unparseable_array_logs_warning(caplog):
+    with caplog.at_level(logging.WARNING, logger="app.llm"):
+        assert extract_json_array('Result: [{"title": "A",}] and [x]') is None
+
+    assert "JSON array parse error" in caplog.text
@@ -0,0 +1,143 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models import LLMInputLog, LLMProcessingLog
+from app.ai.log_writer import LLMLogWriter, build_log_record, copy_llm_input_logs, insert_llm_logs
+
+
+def make_engine():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    LLMInputLog.metadata.create_all(engine, tables=[LLMInputLog.__table__, LLMProcessingLog.__table__])
+    return engine
+
+def make_writer(engine, **kwargs):
+    return LLMLogWriter(session_factory=sessionmaker(bind=engine), async_session_factory=None, **kwargs)
+
+def completed_record(input_text="prompt"):
+    return build_log_record(
+        "user-1", "session-1", input_text, "deep_dive_analysis",
+        output_text="analysis", status="completed", processing_time_ms=12,
+        context={"source": "test"}, stage="deep_dive"
+    )
+
+def failed_record(input_text="prompt"):
+    return build_log_record(
+        "user-1", "session-1", input_text, "deep_dive_analysis",
+        status="failed", error_message="boom", processing_time_ms=3, stage="deep_dive"
+    )
+
+def logged_inputs(engine):
+    with Session(engine) as session:
+        return session.scalars(select(LLMInputLog).order_by(LLMInputLog.id)).all()
+
+def test_writer_round_trips_records():
+    engine = make_engine()
+    writer = make_writer(engine)
+
+    async def run():
+        writer.start()
+        writer.enqueue(completed_record("first"))
+        writer.enqueue(failed_record("second"))
+        await writer.stop()
+    asyncio.run(run())
+
+    first, second = logged_inputs(engine)
+    assert first.input_text == "first"
+    assert first.session_id == "session-1"
+    assert first.stage == "deep_dive"
+    assert first.input_type == "deep_dive_analysis"
+    assert first.context_json == '{"source":"test"}'
+    assert first.output_text == "analysis"
+    assert first.status == "completed"
+    assert first.processing_time_ms == 12
+    assert second.status == "failed"
+
+    with Session(engine) as session:
+        failures = session.scalars(select(LLMProcessingLog)).all()
+    assert len(failures) == 1
+    assert failures[0].input_id == second.id
+    assert failures[0].error == "boom"
+
+def test_writer_writes_directly_outside_its_loop():
+    engine = make_engine()
+    make_writer(engine).enqueue(completed_record())
+    assert [row.input_text for row in logged_inputs(engine)] == ["prompt"]
+
+def test_writer_hands_off_writes_when_not_started_inside_a_loop():
+    engine = make_engine()
+    writer = make_writer(engine)
+    write_threads = []
+    write = writer._write
+    writer._write = lambda records: write_threads.append(threading.get_ident()) or write(records)
+
+    async def run():
+        writer.enqueue(completed_record())
+        await asyncio.sleep(0.1)
+    asyncio.run(run())
+
+    # The insert ran in the default executor, not on the loop's thread
+    assert len(write_threads) == 1 and write_threads[0] != threading.get_ident()
+    assert [row.input_text for row in logged_inputs(engine)] == ["prompt"]
+
+def test_unknown_column_raises_before_inserting():
+    engine = make_engine()
+    record = completed_record()
+    record["input"]["context"] = "{}"
+    with Session(engine) as session:
+        with pytest.raises(ValueError, match="context"):
+            insert_llm_logs(session, [record])
+    assert logged_inputs(engine) == []
+
+def test_copy_uses_input_log_columns():
+    calls = []
+
+    async def copy_records_to_table(table, columns, records):
+        calls.append((table, columns, records))
+
+    raw_connection = SimpleNamespace(driver_connection=SimpleNamespace(copy_records_to_table=copy_records_to_table))
+
+    async def get_raw_connection():
+        return raw_connection
+
+    async def connection():
+        return SimpleNamespace(get_raw_connection=get_raw_connection)
+
+    asyncio.run(copy_llm_input_logs(SimpleNamespace(connection=connection), [completed_record("copied")]))
+
+    (table, columns, records), = calls
+    assert table == "llm_input_log"
+    assert set(columns) <= set(LLMInputLog.__table__.c.keys())
+    row = dict(zip(columns, records[0]))
+    assert row["input_text"] == "copied"
+    assert row["context_json"] == '{"source":"test"}'
+    assert row["created_at"] is not None
+
+def enqueue_past_capacity(engine, overflow):
+    writer = make_writer(engine, max_queue_size=2, overflow=overflow)
+
+    async def run():
+        writer.start()
+        # Nothing is consumed until this coroutine yields, so the third record overflows
+        for text in ("one", "two", "three"):
+            writer.enqueue(completed_record(text))
+        await writer.stop()
+    asyncio.run(run())
+    return writer
+
+def test_queue_overflow_drops_oldest():
+    engine = make_engine()
+    writer = enqueue_past_capacity(engine, "drop_oldest")
+    assert writer.dropped == 1
+    assert [row.input_text for row in logged_inputs(engine)] == ["two", "three"]
+
+def test_queue_overflow_drops_newest():
+    engine = make_engine()
+    writer = enqueue_past_capacity(engine, "drop_newest")
+    assert writer.dropped == 1
+    assert [row.input_text for row in logged_inputs(engine)] == ["one", "two"]
@@ -0,0 +1,39 @@
+from app.ai.base import StageProcessor
+
+
+split = StageProcessor._split_batch_output
+
+
+def test_split_returns_sections_in_order():
+    text = "=== OUTPUT 1 ===\nfirst\n=== OUTPUT 2 ===\nsecond\n"
+
+    assert split(text, 2) == ["first", "second"]
+
+def test_split_ignores_preamble():
+    text = "Here are the analyses:\n=== OUTPUT 1 ===\nfirst\n=== OUTPUT 2 ===\nsecond"
+
+    assert split(text, 2) == ["first", "second"]
+
+def test_split_matches_out_of_order_sections_by_number():
+    text = "=== OUTPUT 2 ===\nsecond\n=== OUTPUT 1 ===\nfirst"
+
+    assert split(text, 2) == ["first", "second"]
+
+def test_split_marks_missing_and_empty_sections():
+    text = "=== OUTPUT 1 ===\nfirst\n=== OUTPUT 3 ===\n\n"
+
+    assert split(text, 3) == ["first", None, None]
+
+def test_split_keeps_first_of_repeated_sections():
+    text = "=== OUTPUT 1 ===\nfirst\n=== OUTPUT 1 ===\nrepeat"
+
+    assert split(text, 1) == ["first"]
+
+def test_split_ignores_extra_sections_and_inline_markers():
+    text = "=== OUTPUT 1 ===\nsee === OUTPUT 2 === below\n=== OUTPUT 5 ===\nextra"
+
+    assert split(text, 2) == ["see === OUTPUT 2 === below", None]
+
+def test_split_without_markers():
+    assert split("no sections here", 2) == [None, None]
+    assert split(None, 1) == [None]